@@ -0,0 +1,91 @@
+"""
+Measures the cost of building `Node` objects from server data, comparing the
+validated constructor against the trusted path used by `Project.get_nodes`, both in
+time and in memory held per node.
+
+Run it from the repository root:
+
+```shell
+PYTHONPATH=. python benchmarks/hydration.py
+```
+"""
+import json
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from gns3fy import Node
+from gns3fy.gns3fy import _compact_node_data, _from_api
+
+DATA_FILES = Path(__file__).resolve().parents[1] / "tests" / "data"
+TOTAL_NODES = 2000
+
+
+def nodes_payload(total=TOTAL_NODES):
+    "Builds a `/projects/{id}/nodes` like payload out of the test data"
+    with open(DATA_FILES / "nodes.json") as fdata:
+        data = json.load(fdata)
+    payload = []
+    for index in range(total):
+        _node = json.loads(json.dumps(data[index % len(data)]))
+        _node.update(node_id=f"node-{index}", name=f"node-{index}")
+        payload.append(_node)
+    return payload
+
+
+def validated(payload):
+    "Hydration as previously done by `Project.get_nodes`"
+    nodes = []
+    for _node in payload:
+        _n = Node(connector=None, **_node)
+        _n.project_id = _node["project_id"]
+        nodes.append(_n)
+    return nodes
+
+
+def trusted(payload):
+    "Hydration through the trusted path"
+    return [
+        _from_api(Node, _node, connector=None, project_id=_node["project_id"])
+        for _node in payload
+    ]
+
+
+def compact(payload):
+    "Hydration through the trusted path with the compacted payload"
+    return [
+        _from_api(
+            Node,
+            _compact_node_data(_node),
+            connector=None,
+            project_id=_node["project_id"],
+        )
+        for _node in payload
+    ]
+
+
+def memory_per_node(func):
+    "Bytes held per node, counting the payload decoded for them"
+    tracemalloc.start()
+    _before = tracemalloc.get_traced_memory()[0]
+    payload = nodes_payload()
+    nodes = func(payload)
+    del payload
+    _held = tracemalloc.get_traced_memory()[0] - _before
+    tracemalloc.stop()
+    return _held / len(nodes)
+
+
+def main():
+    for func in (validated, trusted, compact):
+        payload = nodes_payload()
+        _time = min(timeit.repeat(lambda: func(payload), number=1, repeat=5))
+        print(
+            f"{func.__name__:>9}: {_time * 1000:8.2f} ms per {len(payload)} nodes -- "
+            f"{_time / len(payload) * 1e6:6.2f} us per node -- "
+            f"{memory_per_node(func) / 1024:6.2f} KiB per node"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
-from .gns3fy import Gns3Connector, Project, Node, Link
+from .gns3fy import Gns3Connector, Project, Node, Link, ChaosScheduler, BatchError
 
-__all__ = ["Gns3Connector", "Project", "Node", "Link"]
+__all__ = ["Gns3Connector", "Project", "Node", "Link", "ChaosScheduler", "BatchError"]
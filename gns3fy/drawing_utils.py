@@ -2,6 +2,14 @@
 Functions used as helpers for drawing objects in a GNS3 Project.
 """
 
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from html import escape
+from itertools import repeat
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+Column = Union[float, str, Sequence]
+
 
 def generate_rectangle_svg(
     height: int = 100,
@@ -59,3 +67,387 @@ def parsed_x(x: int, obj_width: int = 100) -> int:
 
 def parsed_y(y: int, obj_height: int = 100) -> int:
     return (y * obj_height) * -1
+
+
+def _num(value: float) -> str:
+    "Compact number rounded to 2 decimals, without the decimals of integral values"
+    _text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return "0" if _text == "-0" else _text
+
+
+def _attribute(value) -> str:
+    "Attribute value escaped for XML and for `str.format`"
+    _text = value if isinstance(value, str) else _num(value)
+    return escape(_text, quote=True).replace("{", "{{").replace("}", "}}")
+
+
+@lru_cache(maxsize=256)
+def _style_template(shape: str, style: Tuple[Tuple[str, object], ...]) -> str:
+    """
+    SVG template of a shape with its style attributes already rendered, so the
+    drawings sharing a style only fill in their geometry with `str.format`
+    """
+    _style = "".join(
+        f' {_name.replace("_", "-")}="{_attribute(_value)}"' for _name, _value in style
+    )
+    if shape == "rect":
+        _body = f'<rect{_style} height="{{h}}" width="{{w}}"/>'
+    elif shape == "ellipse":
+        _body = f'<ellipse cx="{{rx}}" cy="{{ry}}"{_style} rx="{{rx}}" ry="{{ry}}"/>'
+    elif shape == "line":
+        _body = f'<line{_style} x1="{{x1}}" x2="{{x2}}" y1="{{y1}}" y2="{{y2}}"/>'
+    else:
+        _body = f"<text{_style}>{{text}}</text>"
+    return f'<svg height="{{h}}" width="{{w}}">{_body}</svg>'
+
+
+def _columns(*columns: Column) -> List[Sequence]:
+    "Columns of the same length, repeating the single values"
+    _length = max(
+        (len(_c) for _c in columns if not isinstance(_c, (str, int, float))),
+        default=1,
+    )
+    _result = []
+    for _column in columns:
+        if isinstance(_column, (str, int, float)):
+            _column = list(repeat(_column, _length))
+        elif len(_column) != _length:
+            raise ValueError("Columns must have the same length")
+        _result.append(_column)
+    return _result
+
+
+class DrawingBuilder:
+    """
+    Generates many drawings at once from columns of values: one value per drawing,
+    or a single value for all of them. Each call adds the drawings and returns the
+    builder, so calls can be chained:
+
+    ```python
+    >>> builder = DrawingBuilder(z=0)
+    >>> builder.rectangles(x=[0, 300], y=0, width=200, height=100, fill="#e6f2ff")
+    >>> builder.labels(x=[0, 300], y=-30, text=["Site A", "Site B"])
+    >>> project.create_drawings(builder.drawings)
+    ```
+
+    `drawings` holds dictionaries with the `svg`, `x`, `y` and `z` of each drawing,
+    ready to be given to `Project.create_drawing`. The SVG of each shape comes from a
+    template cached by its style, so only the geometry is formatted per drawing.
+    """
+
+    def __init__(self, z: int = 0):
+        self.z = z
+        self.drawings: List[Dict] = []
+
+    def __len__(self):
+        return len(self.drawings)
+
+    def _add(self, template, xs, ys, geometry):
+        # Positions are whole pixels, rounded to the nearest one
+        self.drawings.extend(
+            dict(
+                svg=template.format(**_geometry),
+                x=int(round(_x)),
+                y=int(round(_y)),
+                z=self.z,
+            )
+            for _x, _y, _geometry in zip(xs, ys, geometry)
+        )
+
+    def rectangles(
+        self,
+        x: Column,
+        y: Column,
+        width: Column = 200,
+        height: Column = 100,
+        fill: str = "#ffffff",
+        fill_opacity: float = 1.0,
+        stroke: str = "#000000",
+        stroke_width: int = 2,
+    ) -> "DrawingBuilder":
+        _template = _style_template(
+            "rect",
+            (
+                ("fill", fill),
+                ("fill_opacity", fill_opacity),
+                ("stroke", stroke),
+                ("stroke_width", stroke_width),
+            ),
+        )
+        xs, ys, widths, heights = _columns(x, y, width, height)
+        self._add(
+            _template,
+            xs,
+            ys,
+            ({"h": _num(_h), "w": _num(_w)} for _w, _h in zip(widths, heights)),
+        )
+        return self
+
+    def ellipses(
+        self,
+        x: Column,
+        y: Column,
+        width: Column = 200,
+        height: Column = 200,
+        fill: str = "#ffffff",
+        fill_opacity: float = 1.0,
+        stroke: str = "#000000",
+        stroke_width: int = 2,
+    ) -> "DrawingBuilder":
+        _template = _style_template(
+            "ellipse",
+            (
+                ("fill", fill),
+                ("fill_opacity", fill_opacity),
+                ("stroke", stroke),
+                ("stroke_width", stroke_width),
+            ),
+        )
+        xs, ys, widths, heights = _columns(x, y, width, height)
+        self._add(
+            _template,
+            xs,
+            ys,
+            (
+                {"h": _num(_h), "w": _num(_w), "rx": _num(_w / 2), "ry": _num(_h / 2)}
+                for _w, _h in zip(widths, heights)
+            ),
+        )
+        return self
+
+    def lines(
+        self,
+        x1: Column,
+        y1: Column,
+        x2: Column,
+        y2: Column,
+        stroke: str = "#000000",
+        stroke_width: int = 2,
+        stroke_dasharray: str = "",
+    ) -> "DrawingBuilder":
+        """
+        Lines between two points of the canvas, like connectors between nodes. Each
+        drawing is placed on the top left corner of its line.
+        """
+        _style: Tuple[Tuple[str, object], ...] = (
+            ("stroke", stroke),
+            ("stroke_width", stroke_width),
+        )
+        if stroke_dasharray:
+            _style = (("stroke_dasharray", stroke_dasharray),) + _style
+        _template = _style_template("line", _style)
+        _x1, _y1, _x2, _y2 = _columns(x1, y1, x2, y2)
+        xs = [min(_a, _b) for _a, _b in zip(_x1, _x2)]
+        ys = [min(_a, _b) for _a, _b in zip(_y1, _y2)]
+        self._add(
+            _template,
+            xs,
+            ys,
+            (
+                {
+                    "h": _num(abs(_b - _a)),
+                    "w": _num(abs(_d - _c)),
+                    "x1": _num(_c - _x),
+                    "x2": _num(_d - _x),
+                    "y1": _num(_a - _y),
+                    "y2": _num(_b - _y),
+                }
+                for _a, _b, _c, _d, _x, _y in zip(_y1, _y2, _x1, _x2, xs, ys)
+            ),
+        )
+        return self
+
+    def labels(
+        self,
+        x: Column,
+        y: Column,
+        text: Column,
+        fill: str = "#000000",
+        font_family: str = "TypeWriter",
+        font_size: int = 10,
+        font_weight: str = "normal",
+    ) -> "DrawingBuilder":
+        "Text drawings, sized by an estimate of the width of their characters"
+        _template = _style_template(
+            "text",
+            (
+                ("fill", fill),
+                ("font_family", font_family),
+                ("font_size", font_size),
+                ("font_weight", font_weight),
+            ),
+        )
+        xs, ys, texts = _columns(x, y, text)
+        _height = _num(font_size * 1.5)
+        self._add(
+            _template,
+            xs,
+            ys,
+            (
+                {
+                    "h": _height,
+                    "w": _num(int(len(str(_t)) * font_size * 0.6) + 1),
+                    "text": escape(str(_t)),
+                }
+                for _t in texts
+            ),
+        )
+        return self
+
+    def grid(
+        self,
+        x: float,
+        y: float,
+        columns: int,
+        rows: int,
+        cell_width: float = 100,
+        cell_height: float = 100,
+        stroke: str = "#cccccc",
+        stroke_width: int = 1,
+    ) -> "DrawingBuilder":
+        "Lines of a grid of `columns` by `rows` cells, with its top left on `(x, y)`"
+        _right, _bottom = x + columns * cell_width, y + rows * cell_height
+        _ys = [y + _row * cell_height for _row in range(rows + 1)]
+        _xs = [x + _col * cell_width for _col in range(columns + 1)]
+        self.lines(x, _ys, _right, _ys, stroke=stroke, stroke_width=stroke_width)
+        self.lines(_xs, y, _xs, _bottom, stroke=stroke, stroke_width=stroke_width)
+        return self
+
+    def legend(
+        self,
+        x: float,
+        y: float,
+        entries: Dict[str, str],
+        swatch: int = 20,
+        spacing: int = 10,
+        font_size: int = 10,
+    ) -> "DrawingBuilder":
+        """
+        A legend on `(x, y)` with a coloured swatch and a label for each of the
+        `entries`, given as a dictionary of fill colours by label
+        """
+        _ys = [y + index * (swatch + spacing) for index in range(len(entries))]
+        for _fill, _y in zip(entries.values(), _ys):
+            self.rectangles(x, _y, swatch, swatch, fill=_fill, stroke_width=1)
+        _offset = (swatch - font_size * 1.5) / 2
+        self.labels(
+            x + swatch + spacing,
+            [_y + _offset for _y in _ys],
+            list(entries),
+            font_size=font_size,
+        )
+        return self
+
+
+class Rect(NamedTuple):
+    width: float = 0
+    height: float = 0
+    x: float = 0
+    y: float = 0
+    fill: Optional[str] = None
+    fill_opacity: Optional[float] = None
+    stroke: Optional[str] = None
+    stroke_width: Optional[float] = None
+
+
+class Ellipse(NamedTuple):
+    cx: float = 0
+    cy: float = 0
+    rx: float = 0
+    ry: float = 0
+    fill: Optional[str] = None
+    fill_opacity: Optional[float] = None
+    stroke: Optional[str] = None
+    stroke_width: Optional[float] = None
+
+
+class Line(NamedTuple):
+    x1: float = 0
+    y1: float = 0
+    x2: float = 0
+    y2: float = 0
+    stroke: Optional[str] = None
+    stroke_width: Optional[float] = None
+    stroke_dasharray: Optional[str] = None
+
+
+class Text(NamedTuple):
+    text: str
+    fill: Optional[str] = None
+    fill_opacity: Optional[float] = None
+    font_family: Optional[str] = None
+    font_size: Optional[float] = None
+    font_weight: Optional[str] = None
+
+
+class Svg(NamedTuple):
+    "Size of the SVG of a drawing and the shapes it holds, in document order"
+    width: float
+    height: float
+    shapes: Tuple[Union[Rect, Ellipse, Line, Text], ...] = ()
+
+
+_SHAPES = {"rect": Rect, "ellipse": Ellipse, "line": Line, "text": Text}
+
+
+def _tag(element: ET.Element) -> str:
+    "Tag of the element without its namespace"
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _shape(element: ET.Element):
+    _cls = _SHAPES[_tag(element)]
+    _values = {}
+    for _field in _cls._fields:
+        if _field == "text":
+            _values[_field] = "".join(element.itertext())
+            continue
+        _value = element.get(_field.replace("_", "-"))
+        if _value is None:
+            continue
+        _type = _cls.__annotations__[_field]
+        _values[_field] = _value if _type in (str, Optional[str]) else float(_value)
+    return _cls(**_values)
+
+
+# Only the SVGs up to this length are memoised, so drawings embedding images are not
+# kept in memory by the cache of `parse_svg`
+_SVG_CACHE_MAX_LENGTH = 16 * 1024
+
+
+def _parse_svg(svg: str) -> Svg:
+    try:
+        _root = ET.fromstring(svg)
+    except ET.ParseError as err:
+        raise ValueError(f"Not a valid SVG: {err}")
+    try:
+        return Svg(
+            float(_root.get("width", 0)),
+            float(_root.get("height", 0)),
+            tuple(_shape(_e) for _e in _root.iter() if _tag(_e) in _SHAPES),
+        )
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Not a valid SVG: {err}")
+
+
+_parse_svg_memoised = lru_cache(maxsize=1024)(_parse_svg)
+
+
+def parse_svg(svg: str) -> Svg:
+    """
+    Parses the SVG of a drawing into its size and its `Rect`, `Ellipse`, `Line` and
+    `Text` shapes, with their geometry and style. Other elements are skipped, and
+    missing attributes are `None` (or `0` for the geometry).
+
+    Results are memoised by the SVG content (for SVGs up to 16 KiB) and immutable,
+    so drawings sharing an SVG (or parsed again, like on each collision check) are
+    parsed only once and can be compared for equality:
+
+    ```python
+    >>> parse_svg(lab.drawings[0]["svg"]).shapes
+    (Rect(width=200.0, height=100.0, x=0, y=0, fill='#ffffff', ...),)
+    ```
+    """
+    if len(svg) > _SVG_CACHE_MAX_LENGTH:
+        return _parse_svg(svg)
+    return _parse_svg_memoised(svg)
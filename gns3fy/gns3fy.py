@@ -1,14 +1,30 @@
 import os
+import re
+import sys
+import json
+import copy
 import time
+import uuid
+import heapq
+import hashlib
+import tempfile
+import threading
 import requests
-from functools import wraps
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial, wraps
+from html import escape, unescape
+from math import sqrt
 from urllib.parse import urlparse
 from requests import HTTPError
-from dataclasses import field
+from requests.adapters import HTTPAdapter
+from dataclasses import field, MISSING
 from typing import Optional, Any, Dict, List
 from pydantic import validator
 from pydantic.dataclasses import dataclass
-from math import pi, sin, cos
+from . import drawing_utils, layout_utils
+from .pcap_utils import iter_pcap_packets
 
 
 class Config:
@@ -47,6 +63,14 @@ CONSOLE_TYPES = [
 
 LINK_TYPES = ["ethernet", "serial"]
 
+PROJECT_COLLECTIONS = ("snapshots", "drawings", "nodes", "links")
+
+# Size in bytes of the chunks used when streaming files
+CHUNK_SIZE = 64 * 1024
+
+# Name of the zone of `Project.draw_zones`, kept in the root of its SVG
+_ZONE_NAME = re.compile(r'<svg\b[^>]*?\sdata-zone="([^"]*)"')
+
 
 class Gns3Connector:
     """
@@ -59,6 +83,10 @@ class Gns3Connector:
     - `cred` (str): Password used for authentication
     - `verify` (bool): Whether or not to verify SSL
     - `api_version` (int): GNS3 server REST API version
+    - `max_workers` (int): Maximum amount of concurrent requests used by the bulk
+    operations, like `Project.batch`
+    - `node_names_ttl` (int): Seconds the node IDs cached by name (used for `Node`
+    objects that only have a `name`) are kept
     - `api_calls`: Counter of amount of `http_calls` has been performed
     - `base_url`: url passed + api_version
     - `session`: Requests Session object
@@ -76,14 +104,30 @@ class Gns3Connector:
     ```
     """
 
-    def __init__(self, url=None, user=None, cred=None, verify=False, api_version=2):
+    def __init__(
+        self,
+        url=None,
+        user=None,
+        cred=None,
+        verify=False,
+        api_version=2,
+        max_workers=10,
+        node_names_ttl=30,
+    ):
         requests.packages.urllib3.disable_warnings()
         self.base_url = f"{url.strip('/')}/v{api_version}"
         self.user = user
         self.cred = cred
         self.headers = {"Content-Type": "application/json"}
         self.verify = verify
+        self.max_workers = max_workers
+        self.node_names_ttl = node_names_ttl
         self.api_calls = 0
+        self._lock = threading.Lock()
+        # Node IDs by name for each project, with the time they were cached
+        self._node_names = {}
+        # Local image MD5s by path, with the size and mtime they were computed for
+        self._image_hashes = {}
 
         # Create session object
         self._create_session()
@@ -96,6 +140,10 @@ class Gns3Connector:
         self.session.headers["Accept"] = "application/json"
         if self.user:
             self.session.auth = (self.user, self.cred)
+        # Keep a connection per worker of the concurrent operations
+        _adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount("http://", _adapter)
+        self.session.mount("https://", _adapter)
 
     def http_call(
         self,
@@ -106,6 +154,7 @@ class Gns3Connector:
         headers=None,
         verify=False,
         params=None,
+        stream=False,
     ):
         """
         Performs the HTTP operation actioned
@@ -120,22 +169,35 @@ class Gns3Connector:
         - `headers`: ictionary of HTTP Headers to attach to the Request
         - `verify`: SSL Verification
         - `params`: Dictionary or bytes to be sent in the query string for the Request
+        - `stream`: Whether to defer the download of the response body, to be read
+        in chunks with `iter_content`
         """
         if data:
             _response = getattr(self.session, method.lower())(
-                url, data=data, headers=headers, params=params, verify=verify
+                url,
+                data=data,
+                headers=headers,
+                params=params,
+                verify=verify,
+                stream=stream,
             )
 
         elif json_data:
             _response = getattr(self.session, method.lower())(
-                url, json=json_data, headers=headers, params=params, verify=verify
+                url,
+                json=json_data,
+                headers=headers,
+                params=params,
+                verify=verify,
+                stream=stream,
             )
 
         else:
             _response = getattr(self.session, method.lower())(
-                url, headers=headers, params=params, verify=verify
+                url, headers=headers, params=params, verify=verify, stream=stream
             )
-        self.api_calls += 1
+        with self._lock:
+            self.api_calls += 1
 
         try:
             _response.raise_for_status()
@@ -340,6 +402,55 @@ class Gns3Connector:
             "get", url=f"{self.base_url}/projects/{project_id}/nodes"
         ).json()
 
+    def _index_node_names(self, project_id, nodes):
+        """
+        Caches the node IDs of a project by their names, out of the nodes data or
+        their `Node` objects
+        """
+        _index = {}
+        for _node in nodes:
+            if isinstance(_node, dict):
+                _name, _node_id = _node["name"], _node["node_id"]
+            else:
+                _name, _node_id = _node.name, _node.node_id
+            _index.setdefault(_name, []).append(_node_id)
+        self._node_names[project_id] = (time.time(), _index)
+
+    def _forget_node_names(self, project_id):
+        "Drops the cached node IDs of a project, after its nodes are changed"
+        self._node_names.pop(project_id, None)
+
+    def get_node_id(self, project_id, name):
+        """
+        Returns the ID of a node by its name. The IDs by name are cached for
+        `node_names_ttl` seconds (or until they are retrieved again with
+        `Project.get_nodes`), so the nodes are only queried when needed. They are
+        dropped when a node of the project is created, renamed or deleted.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `name`
+        """
+        _cached = self._node_names.get(project_id)
+        _refreshed = _cached is None or time.time() - _cached[0] > self.node_names_ttl
+        if _refreshed:
+            self._index_node_names(project_id, self.get_nodes(project_id))
+
+        _node_ids = self._node_names[project_id][1].get(name)
+        if not _node_ids and not _refreshed:
+            # It could have been created since it was cached
+            self._index_node_names(project_id, self.get_nodes(project_id))
+            _node_ids = self._node_names[project_id][1].get(name)
+
+        if not _node_ids:
+            raise ValueError(f"Node not found: {name}")
+        if len(_node_ids) > 1:
+            raise ValueError(
+                "Multiple nodes found with same name. Need to submit node_id"
+            )
+        return _node_ids[0]
+
     def get_node(self, project_id, node_id):
         """
         Returns the node by locating its ID.
@@ -403,8 +514,62 @@ class Gns3Connector:
         """
         _url = f"{self.base_url}/projects/{project_id}"
         self.http_call("delete", _url)
+        self._forget_node_names(project_id)
         return
 
+    def import_project(
+        self,
+        path,
+        name=None,
+        project_id=None,
+        chunk_size=CHUNK_SIZE,
+        progress=None,
+        checksum=None,
+        checksum_algorithm="sha256",
+    ):
+        """
+        Imports a project archive, like the ones of `Project.export`, streaming it
+        from disk in chunks of `chunk_size` bytes.
+
+        When the expected `checksum` is given (like the one returned by
+        `Project.export`), the archive is hashed before it is sent and a `ValueError`
+        is raised, without uploading it, when the digests don't match.
+
+        **Required Attributes:**
+
+        - `path`: Local path of the project archive
+        - `name`: Name of the imported project. By default is the one of the archive
+        - `project_id`: ID of the imported project. By default a new one is generated
+        - `progress`: Optional callable, called as `progress(sent, total)` in bytes
+        after each chunk
+        - `checksum`: Expected hex digest of the archive
+        - `checksum_algorithm`: Algorithm of the digest. By default is `sha256`, like
+        on `Project.export`
+
+        **Returns**
+
+        JSON project information
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Could not find file: {path}")
+
+        if checksum:
+            _hash = hashlib.new(checksum_algorithm)
+            with open(path, "rb") as _file:
+                for _chunk in iter(partial(_file.read, chunk_size), b""):
+                    _hash.update(_chunk)
+            if checksum != _hash.hexdigest():
+                raise ValueError(
+                    f"Checksum mismatch for {path}: expected {checksum}, "
+                    f"got {_hash.hexdigest()}"
+                )
+
+        project_id = project_id or str(uuid.uuid4())
+        _url = f"{self.base_url}/projects/{project_id}/import"
+        _params = dict(name=name) if name else None
+        _upload = _FileUpload(path, chunk_size, progress)
+        return self.http_call("post", _url, data=_upload, params=_params).json()
+
     def get_computes(self):
         """
         Returns a list of computes.
@@ -444,22 +609,177 @@ class Gns3Connector:
         _url = f"{self.base_url}/computes/{compute_id}/{emulator}/images"
         return self.http_call("get", _url).json()
 
-    def upload_compute_image(self, emulator, file_path, compute_id="local"):
+    def upload_compute_image(
+        self,
+        emulator,
+        file_path,
+        compute_id="local",
+        chunk_size=CHUNK_SIZE,
+        progress=None,
+        verify_checksum=True,
+    ):
         """
         uploads an image for use by a compute.
 
+        The file is streamed in chunks of `chunk_size` bytes through a single reused
+        buffer, while its MD5 is computed on the fly. Afterwards it is checked
+        against the `md5sum` reported by `get_compute_images`.
+
         **Required Attributes:**
 
         - `emulator`: the likes of 'qemu', 'iou', 'docker' ...
         - `file_path`: path of file to be uploaded
         - `compute_id` By default is 'local'
+        - `progress`: Optional callable, called as `progress(sent, total)` in bytes
+        after each chunk
+        - `verify_checksum`: Whether to compare the MD5 with the one of the compute.
+        By default is `True`
+
+        **Returns:**
+
+        MD5 hex digest of the uploaded image
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Could not find file: {file_path}")
 
         _filename = os.path.basename(file_path)
         _url = f"{self.base_url}/computes/{compute_id}/{emulator}/images/{_filename}"
-        self.http_call("post", _url, data=open(file_path, "rb"))
+        _upload = _FileUpload(file_path, chunk_size, progress)
+        self.http_call("post", _url, data=_upload)
+
+        if verify_checksum:
+            _image = next(
+                (
+                    _i
+                    for _i in self.get_compute_images(emulator, compute_id)
+                    if _i["filename"] == _filename
+                ),
+                None,
+            )
+            if _image is None:
+                raise ValueError(f"Image not found on compute: {_filename}")
+            if _image["md5sum"] != _upload.hexdigest:
+                raise ValueError(
+                    f"Checksum mismatch for {_filename}: local {_upload.hexdigest}, "
+                    f"compute {_image['md5sum']}"
+                )
+        return _upload.hexdigest
+
+    def _image_md5(self, file_path):
+        """
+        Returns the MD5 of a local image, reusing the cached value while its size
+        and modification time remain the same
+        """
+        _stat = os.stat(file_path)
+        _key = os.path.abspath(file_path)
+        _cached = self._image_hashes.get(_key)
+        if _cached and _cached[:2] == [_stat.st_size, _stat.st_mtime_ns]:
+            return _cached[2]
+
+        _hash = hashlib.md5()
+        with open(file_path, "rb") as _file:
+            for _chunk in iter(partial(_file.read, CHUNK_SIZE), b""):
+                _hash.update(_chunk)
+        self._image_hashes[_key] = [_stat.st_size, _stat.st_mtime_ns, _hash.hexdigest()]
+        return _hash.hexdigest()
+
+    def images_sync(
+        self,
+        local_dir,
+        emulator,
+        compute_ids=("local",),
+        max_workers=None,
+        bandwidth=None,
+        cache_file=None,
+        progress=None,
+    ):
+        """
+        Uploads the images of a local directory which are missing, or have a
+        different MD5, on each of the computes. The computes are synced concurrently
+        and the local MD5s are cached by file size and modification time, so they
+        are only computed again when the files change. Hidden files and `.md5sum`
+        sidecars are not images, so they are left out.
+
+        **Required Attributes:**
+
+        - `local_dir`: Local directory with the images
+        - `emulator`: the likes of 'qemu', 'iou', 'docker' ...
+        - `compute_ids`: Computes to sync. By default is `("local",)`
+        - `max_workers`: Number of computes synced at the same time. By default is
+        the `max_workers` of the connector
+        - `bandwidth`: Optional cap in bytes per second, shared by all the uploads
+        - `cache_file`: Optional JSON file to keep the local MD5s between runs
+        - `progress`: Optional callable, called as
+        `progress(compute_id, filename, sent, total)` during the uploads
+
+        **Returns:**
+
+        Dictionary by compute ID with the `uploaded` and `skipped` filenames
+        """
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file) as _fdata:
+                self._image_hashes.update(json.load(_fdata))
+
+        _local = {
+            _entry.name: self._image_md5(_entry.path)
+            for _entry in sorted(os.scandir(local_dir), key=lambda e: e.name)
+            if _entry.is_file()
+            and not _entry.name.startswith(".")
+            and not _entry.name.endswith(".md5sum")
+        }
+        if cache_file:
+            with open(cache_file, "w") as _fdata:
+                json.dump(self._image_hashes, _fdata)
+
+        _limiter = _RateLimiter(bandwidth) if bandwidth else None
+
+        def _sync(compute_id):
+            _remote = {
+                _i["filename"]: _i["md5sum"]
+                for _i in self.get_compute_images(emulator, compute_id)
+            }
+            _report = dict(uploaded=[], skipped=[])
+            for _filename, _md5 in _local.items():
+                if _remote.get(_filename) == _md5:
+                    _report["skipped"].append(_filename)
+                    continue
+
+                _sent = [0]
+
+                def _on_chunk(sent, total):
+                    if _limiter:
+                        _limiter.consume(sent - _sent[0])
+                        _sent[0] = sent
+                    if progress:
+                        progress(compute_id, _filename, sent, total)
+
+                self.upload_compute_image(
+                    emulator,
+                    os.path.join(local_dir, _filename),
+                    compute_id=compute_id,
+                    progress=_on_chunk,
+                    verify_checksum=False,
+                )
+                _report["uploaded"].append(_filename)
+
+            # Verify all the uploads with a single listing of the compute
+            if _report["uploaded"]:
+                _remote = {
+                    _i["filename"]: _i["md5sum"]
+                    for _i in self.get_compute_images(emulator, compute_id)
+                }
+                for _filename in _report["uploaded"]:
+                    if _remote.get(_filename) != _local[_filename]:
+                        raise ValueError(
+                            f"Checksum mismatch for {_filename} on compute "
+                            f"{compute_id}"
+                        )
+            return _report
+
+        _reports = _run_concurrently(
+            _sync, compute_ids, max_workers or self.max_workers
+        )
+        return dict(zip(compute_ids, _reports))
 
     def get_compute_ports(self, compute_id="local"):
         """
@@ -477,6 +797,149 @@ class Gns3Connector:
         return self.http_call("get", _url).json()
 
 
+class _RateLimiter:
+    """
+    Caps the bytes per second shared by several threads. Each call to `consume`
+    books the time its bytes take at the given `rate`, after the bytes booked
+    before, and sleeps until then.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        with self._lock:
+            _now = time.monotonic()
+            self._next = max(self._next, _now) + size / self.rate
+            _wait = self._next - _now
+        if _wait > 0:
+            time.sleep(_wait)
+
+
+class _FileUpload:
+    """
+    Request body that streams a file in chunks of `chunk_size` bytes through a single
+    reused buffer, computing its `checksum` digest (MD5 by default) and reporting
+    `progress(sent, total)` as it goes. The file is only open while the body is being
+    sent, and iterating again restarts the upload so retries send the whole file.
+    """
+
+    def __init__(self, file_path, chunk_size=CHUNK_SIZE, progress=None, checksum="md5"):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.checksum = checksum
+        self.size = os.path.getsize(file_path)
+        self.hexdigest = None
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        _hash = hashlib.new(self.checksum)
+        _buffer = bytearray(self.chunk_size)
+        _view = memoryview(_buffer)
+        _sent = 0
+        with open(self.file_path, "rb") as _file:
+            while True:
+                _read = _file.readinto(_buffer)
+                if not _read:
+                    break
+                _hash.update(_view[:_read])
+                _sent += _read
+                yield _view[:_read]
+                if self.progress:
+                    self.progress(_sent, self.size)
+        self.hexdigest = _hash.hexdigest()
+
+
+def _iter_response(response, chunk_size=CHUNK_SIZE):
+    "Yields the body of a streamed `response` in chunks of bytes, then closes it"
+    try:
+        for _chunk in response.iter_content(chunk_size=chunk_size):
+            if _chunk:
+                yield _chunk
+    finally:
+        response.close()
+
+
+def _write_chunks(chunks, dest, checksum=None):
+    """
+    Writes the `chunks` of bytes into `dest`, either a file path or a binary file
+    object. Returns the hex digest of the `checksum` algorithm (like `md5` or
+    `sha256`) computed on the same pass, or `None` when not requested.
+
+    A file path is written as `<dest>.part` and only renamed to `dest` once all the
+    chunks are written, so a failed download never leaves a truncated `dest`.
+    """
+    _hash = hashlib.new(checksum) if checksum else None
+    if not isinstance(dest, (str, os.PathLike)):
+        for _chunk in chunks:
+            dest.write(_chunk)
+            if _hash:
+                _hash.update(_chunk)
+        return _hash.hexdigest() if _hash else None
+
+    _part = f"{os.fspath(dest)}.part"
+    try:
+        with open(_part, "wb") as _file:
+            for _chunk in chunks:
+                _file.write(_chunk)
+                if _hash:
+                    _hash.update(_chunk)
+    except BaseException:
+        if os.path.exists(_part):
+            os.remove(_part)
+        raise
+    os.replace(_part, dest)
+    return _hash.hexdigest() if _hash else None
+
+
+def _with_progress(chunks, progress, total=None):
+    "Yields the `chunks` while calling `progress(received, total)` after each one"
+    _received = 0
+    for _chunk in chunks:
+        yield _chunk
+        _received += len(_chunk)
+        progress(_received, total)
+
+
+def _count_packets(packets, stats):
+    "Yields the `packets` while updating the `stats` counters of `Link.iter_packets`"
+    for _packet in packets:
+        stats["packets"] += 1
+        stats["bytes"] += _packet.length
+        stats["truncated"] += _packet.captured < _packet.length
+        stats["malformed"] += _packet.malformed
+        if stats["first_timestamp"] is None:
+            stats["first_timestamp"] = _packet.timestamp
+        stats["last_timestamp"] = _packet.timestamp
+        _elapsed = _packet.timestamp - stats["first_timestamp"]
+        if _elapsed > 0:
+            stats["bps"] = stats["bytes"] * 8 / _elapsed
+        yield _packet
+
+
+def _svg_size(svg):
+    """
+    Returns the `(width, height)` of the root element of an SVG, from its memoised
+    parsing, or just from the attributes of the root tag when it is not valid XML
+    """
+    try:
+        _svg = drawing_utils.parse_svg(svg)
+        return _svg.width, _svg.height
+    except ValueError:
+        pass
+    _root = svg.split(">", 1)[0]
+    _size = dict(re.findall(r'\b(width|height)="([\d.]+)"', _root))
+    return float(_size.get("width", 0)), float(_size.get("height", 0))
+
+
 def verify_connector_and_id(f):
     """
     Main checker for connector object and respective object's ID for their retrieval
@@ -496,17 +959,7 @@ def verify_connector_and_id(f):
                     raise ValueError("Need to either submit node_id or name")
 
                 # Try to retrieve the node_id
-                _url = f"{self.connector.base_url}/projects/{self.project_id}/nodes"
-                _response = self.connector.http_call("get", _url)
-
-                extracted = [
-                    node for node in _response.json() if node["name"] == self.name
-                ]
-                if len(extracted) > 1:
-                    raise ValueError(
-                        "Multiple nodes found with same name. Need to submit node_id"
-                    )
-                self.node_id = extracted[0]["node_id"]
+                self.node_id = self.connector.get_node_id(self.project_id, self.name)
         # Checks for Link
         if self.__class__.__name__ == "Link":
             if not self.link_id:
@@ -516,6 +969,341 @@ def verify_connector_and_id(f):
     return wrapper
 
 
+# Per-class cache of the field defaults and init flag used by `_from_api`
+_FIELD_DEFAULTS: Dict[type, Any] = {}
+
+
+def _from_api(cls, data, **kwargs):
+    """
+    Builds a `cls` instance from data returned by the GNS3 server, skipping the
+    pydantic validation that is still applied to user supplied input. Keys that are
+    not fields of `cls` are ignored, the same as with the validated constructor.
+
+    Extra keyword arguments (like `connector`) are set on top of `data`.
+    """
+    if cls not in _FIELD_DEFAULTS:
+        _defaults, _factories = {}, {}
+        for _name, _field in cls.__dataclass_fields__.items():
+            if _field.default_factory is not MISSING:
+                _factories[_name] = _field.default_factory
+            else:
+                _defaults[_name] = _field.default
+        # pydantic < 1.8 names the flag `__initialised__`
+        _flag = (
+            "__pydantic_initialised__"
+            if hasattr(cls, "__pydantic_initialised__")
+            else "__initialised__"
+        )
+        _FIELD_DEFAULTS[cls] = (_defaults, _factories, _flag)
+    _defaults, _factories, _flag = _FIELD_DEFAULTS[cls]
+
+    _obj = cls.__new__(cls)
+    _values = _obj.__dict__
+    _values.update(_defaults)
+    for _name, _factory in _factories.items():
+        _values[_name] = _factory()
+    _values.update((k, v) for k, v in data.items() if k in _defaults or k in _factories)
+    _values.update(kwargs)
+    # Mark it as initialised, so assignments from here on are validated again
+    _values[_flag] = True
+    return _obj
+
+
+# Node attributes holding strings that repeat all over a project
+_INTERNED_NODE_KEYS = (
+    "project_id",
+    "compute_id",
+    "node_type",
+    "status",
+    "console_host",
+    "console_type",
+    "port_name_format",
+    "symbol",
+    "template_id",
+)
+
+# Ports shared between nodes with the same ports layout
+_PORT_SCHEMAS: Dict[Any, List] = {}
+_PORT_SCHEMAS_MAX_SIZE = 4096
+
+
+class _ReadOnlyDict(dict):
+    """
+    Dictionary that can't be changed, for the data shared between objects. Copies
+    of it are plain dictionaries.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared data is READ only, copy it before changing it")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _ReadOnlyList(list):
+    """
+    List that can't be changed, for the data shared between objects. Copies of it,
+    and the lists made by adding to it, are plain lists.
+    """
+
+    __slots__ = ()
+
+    _read_only = _ReadOnlyDict._read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(list(self), memo)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _freeze(value):
+    "Returns a READ only version of `value`, with its strings interned"
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return _ReadOnlyDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _ReadOnlyList(_freeze(v) for v in value)
+    return value
+
+
+def _intern_values(data):
+    "Interns the string values of a dictionary, in place"
+    for k, v in data.items():
+        if isinstance(v, str):
+            data[k] = sys.intern(v)
+        elif isinstance(v, dict):
+            _intern_values(v)
+    return data
+
+
+def _compact_node_data(data):
+    """
+    Reduces the memory held by a node payload before it is hydrated. Repeated
+    strings are interned and the `ports` list is replaced by the READ only list of
+    ports shared by all the nodes with the same ports layout.
+    """
+    for k in _INTERNED_NODE_KEYS:
+        if isinstance(data.get(k), str):
+            data[k] = sys.intern(data[k])
+    if isinstance(data.get("label"), dict):
+        _intern_values(data["label"])
+
+    _ports = data.get("ports")
+    if _ports:
+        # Port names identify the layout, the content check covers the rest
+        _key = tuple(_p.get("name") for _p in _ports)
+        _shared = _PORT_SCHEMAS.get(_key)
+        if _shared is None or _shared != _ports:
+            if len(_PORT_SCHEMAS) >= _PORT_SCHEMAS_MAX_SIZE:
+                _PORT_SCHEMAS.clear()
+            _shared = _PORT_SCHEMAS[_key] = _freeze(_ports)
+        data["ports"] = _shared
+    return data
+
+
+def _compact_link_data(data):
+    """
+    Reduces the memory held by a link payload before it is hydrated, by interning
+    its repeated strings (like the node IDs of its endpoints).
+    """
+    for k in ("project_id", "link_type"):
+        if isinstance(data.get(k), str):
+            data[k] = sys.intern(data[k])
+    for _endpoint in data.get("nodes") or []:
+        _intern_values(_endpoint)
+    return data
+
+
+def _patch_fields(obj, data):
+    """
+    Updates in place the fields of `obj` that differ in the server `data`, returning
+    the names of the changed fields
+    """
+    _fields = obj.__dataclass_fields__
+    _values = obj.__dict__
+    _changed = [k for k, v in data.items() if k in _fields and _values[k] != v]
+    for k in _changed:
+        _values[k] = data[k]
+    return _changed
+
+
+def _run_concurrently(func, items, max_workers, errors=None):
+    """
+    Calls `func` with each of the `items` from a pool of `max_workers` threads and
+    returns the results in the same order. Once all the calls are done, the first
+    exception raised (if any) is raised again. When an `errors` list is given, the
+    exceptions are appended to it as `(item, exception)` instead, and their results
+    are `None`.
+    """
+    _items = list(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        _futures = [executor.submit(func, _item) for _item in _items]
+    if errors is None:
+        return [_future.result() for _future in _futures]
+
+    _results = []
+    for _item, _future in zip(_items, _futures):
+        _error = _future.exception()
+        if _error is not None:
+            errors.append((_item, _error))
+        _results.append(None if _error else _future.result())
+    return _results
+
+
+class BatchError(Exception):
+    """
+    Raised when some of the operations sent together failed. The operations that
+    didn't fail are done.
+
+    **Attributes:**
+
+    - `errors` (list): The failed operations as tuples of the object (like a `Node`)
+    and the exception raised
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "Failed operations: "
+            + ", ".join(
+                f"{getattr(_obj, 'name', None) or _obj} ({_error})"
+                for _obj, _error in errors
+            )
+        )
+
+
+# Node attributes that can't be changed with `Node.update`
+_NODE_READ_ONLY = (
+    "project_id",
+    "node_id",
+    "compute_id",
+    "node_type",
+    "node_directory",
+    "status",
+    "ports",
+    "console_host",
+    "command_line",
+    "height",
+    "width",
+    "template_id",
+    "template",
+    "links",
+    "connector",
+)
+
+
+def _differs(current, wanted):
+    """
+    Whether the `current` server value differs from the `wanted` one. Dictionaries
+    are compared only by the keys present on `wanted`, like partial `properties`.
+    """
+    if isinstance(current, dict) and isinstance(wanted, dict):
+        return any(_differs(current.get(k), v) for k, v in wanted.items())
+    return current != wanted
+
+
+def _node_state(node):
+    "Returns a copy of the attributes of `node` that can be changed"
+    return {
+        k: copy.deepcopy(v) if isinstance(v, (dict, list)) else v
+        for k, v in node.__dict__.items()
+        if k in node.__dataclass_fields__ and k not in _NODE_READ_ONLY
+    }
+
+
+class _LazyList(list):
+    """
+    List whose items are retrieved by calling `loader` (with the list itself) the
+    first time it is used. `Project` uses it to defer the retrieval of its
+    collections until accessed.
+    """
+
+    __slots__ = ("_loader",)
+
+    def __init__(self, loader):
+        super().__init__()
+        self._loader = loader
+
+    @property
+    def loaded(self):
+        return self._loader is None
+
+    def _materialise(self):
+        if self._loader is not None:
+            _items = self._loader(self)
+            self._loader = None
+            list.extend(self, _items)
+
+    def __repr__(self):
+        if self._loader is not None:
+            return "<not loaded>"
+        return list.__repr__(self)
+
+
+def _materialising(name):
+    "Wraps the `list` method `name` to materialise the `_LazyList` before its use"
+    _method = getattr(list, name)
+
+    @wraps(_method)
+    def wrapper(self, *args, **kwargs):
+        self._materialise()
+        return _method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in (
+    "__iter__",
+    "__len__",
+    "__getitem__",
+    "__setitem__",
+    "__delitem__",
+    "__contains__",
+    "__reversed__",
+    "__eq__",
+    "__ne__",
+    "__lt__",
+    "__le__",
+    "__gt__",
+    "__ge__",
+    "__add__",
+    "__iadd__",
+    "__mul__",
+    "__rmul__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "index",
+    "count",
+    "sort",
+    "reverse",
+    "copy",
+):
+    setattr(_LazyList, _name, _materialising(_name))
+
+
 @dataclass(config=Config)
 class Link:
     """
@@ -538,6 +1326,9 @@ class Link:
     - `capture_file_name` (str): Read only property. The name of the capture file if
     capture is running
 
+    After `iter_packets` is used, `capture_stats` keeps the counters of the packets
+    read so far.
+
     **Returns:**
 
     `Link` instance
@@ -573,9 +1364,9 @@ class Link:
         return value
 
     def _update(self, data_dict):
-        for k, v in data_dict.items():
-            if k in self.__dict__.keys():
-                self.__setattr__(k, v)
+        # Only used with server responses, so there is no need to validate again
+        _fields = self.__dataclass_fields__
+        self.__dict__.update((k, v) for k, v in data_dict.items() if k in _fields)
 
     @verify_connector_and_id
     def get(self):
@@ -617,6 +1408,156 @@ class Link:
         self.project_id = None
         self.link_id = None
 
+    @verify_connector_and_id
+    def update(self, **kwargs):
+        """
+        Updates the link instance by passing the keyword arguments of the attributes
+        you want updated
+
+        Example to emulate a WAN link with 50ms of latency, 10ms of jitter and 1% of
+        packet loss:
+
+        ```python
+        link.update(filters={"delay": [50, 10], "packet_loss": [1]})
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `link_id`
+        """
+        _url = (
+            f"{self.connector.base_url}/projects/{self.project_id}/links/{self.link_id}"
+        )
+
+        _response = self.connector.http_call("put", _url, json_data=kwargs)
+
+        # Update object
+        self._update(_response.json())
+
+    @verify_connector_and_id
+    def start_capture(self, capture_file_name=None, data_link_type=None):
+        """
+        Starts a packet capture on the link. It updates the `capturing` and
+        `capture_file_*` attributes with the server response.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `link_id`
+        - `capture_file_name`: Name of the capture file. By default the server
+        generates one from the nodes of the link
+        - `data_link_type`: Like `DLT_EN10MB`. By default is the one of the link type
+        """
+        _url = (
+            f"{self.connector.base_url}/projects/{self.project_id}/links/{self.link_id}"
+            "/start_capture"
+        )
+        data = dict(capture_file_name=capture_file_name, data_link_type=data_link_type)
+        data = {k: v for k, v in data.items() if v is not None}
+
+        _response = self.connector.http_call("post", _url, json_data=data)
+
+        # Update object
+        self._update(_response.json())
+
+    @verify_connector_and_id
+    def stop_capture(self):
+        """
+        Stops the packet capture on the link. It updates the `capturing` attribute
+        with the server response.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `link_id`
+        """
+        _url = (
+            f"{self.connector.base_url}/projects/{self.project_id}/links/{self.link_id}"
+            "/stop_capture"
+        )
+
+        _response = self.connector.http_call("post", _url)
+
+        # Update object
+        self._update(_response.json())
+
+    @verify_connector_and_id
+    def iter_pcap(self, chunk_size=CHUNK_SIZE):
+        """
+        Retrieves the pcap stream of the link capture as chunks of bytes. While the
+        capture is running the server keeps sending the new packets.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `link_id`
+        """
+        _url = (
+            f"{self.connector.base_url}/projects/{self.project_id}/links/{self.link_id}"
+            "/pcap"
+        )
+
+        _response = self.connector.http_call("get", _url, stream=True)
+        return _iter_response(_response, chunk_size)
+
+    @verify_connector_and_id
+    def read_pcap(self, dest, chunk_size=CHUNK_SIZE, checksum=None):
+        """
+        Downloads the pcap stream of the link capture straight into `dest`, either a
+        file path or a binary file object, in chunks of `chunk_size` bytes. When
+        `checksum` is an algorithm name (like `md5` or `sha256`), the digest is
+        computed while downloading and returned.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `link_id`
+        - `dest`: Local file path or binary file object
+        """
+        return _write_chunks(self.iter_pcap(chunk_size), dest, checksum)
+
+    @verify_connector_and_id
+    def iter_packets(self, chunk_size=CHUNK_SIZE):
+        """
+        Parses the pcap stream of the link capture while it is received, yielding a
+        `Packet` with the timestamp, lengths and L2/L3 headers of each one. Nothing
+        is written to disk.
+
+        The `capture_stats` attribute is reset and keeps the counters of `packets`,
+        `bytes`, `truncated` and `malformed` packets, the first and last timestamps
+        and the throughput in `bps` between them.
+
+        Example to follow a long running capture:
+
+        ```python
+        >>> for packet in link.iter_packets():
+        ...     print(packet.src_ip, packet.dst_ip, link.capture_stats["bps"])
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `link_id`
+        """
+        self.capture_stats = dict(
+            packets=0,
+            bytes=0,
+            truncated=0,
+            malformed=0,
+            first_timestamp=None,
+            last_timestamp=None,
+            bps=0.0,
+        )
+        _packets = iter_pcap_packets(self.iter_pcap(chunk_size))
+        return _count_packets(_packets, self.capture_stats)
+
     def create(self):
         """
         Creates a link endpoint
@@ -635,10 +1576,10 @@ class Link:
         _url = f"{self.connector.base_url}/projects/{self.project_id}/links"
 
         data = {
-            k: v
-            for k, v in self.__dict__.items()
-            if k not in ("connector", "__initialised__")
-            if v is not None
+            k: getattr(self, k)
+            for k in self.__dataclass_fields__
+            if k != "connector"
+            if getattr(self, k) is not None
         }
 
         _response = self.connector.http_call("post", _url, json_data=data)
@@ -666,7 +1607,8 @@ class Node:
     - `template`: Template name from the which the node is from.
     - `node_directory` (str): Working directory of the node. Read only
     - `status` (enum): Possible values: stopped, started, suspended
-    - `ports` (list): List of node ports, READ only
+    - `ports` (list): List of node ports, READ only. Nodes with the same ports
+    layout share the same list, which can't be changed in place
     - `port_name_format` (str): Formating for port name {0} will be replace by port
     number
     - `port_segment_size` (int): Size of the port segment
@@ -753,9 +1695,10 @@ class Node:
         return value
 
     def _update(self, data_dict):
-        for k, v in data_dict.items():
-            if k in self.__dict__.keys():
-                self.__setattr__(k, v)
+        # Only used with server responses, so there is no need to validate again
+        _fields = self.__dataclass_fields__
+        data_dict = _compact_node_data(data_dict)
+        self.__dict__.update((k, v) for k, v in data_dict.items() if k in _fields)
 
     @verify_connector_and_id
     def get(self, get_links=True):
@@ -763,6 +1706,11 @@ class Node:
         Retrieves the node information. When `get_links` is `True` it also retrieves the
         links respective to the node.
 
+        Nodes retrieved from a `Project` whose links were already retrieved (with its
+        `get_links` method), and not invalidated since, take them from there instead
+        of requesting them per node. Use `get_links` to query them directly from the
+        node endpoint.
+
         **Required Attributes:**
 
         - `project_id`
@@ -778,7 +1726,17 @@ class Node:
         self._update(_response.json())
 
         if get_links:
-            self.get_links()
+            _project = getattr(self, "_project", None)
+            if (
+                _project is not None
+                and _project._links_by_node is not None
+                and not _project.is_stale("links")
+            ):
+                self.__dict__["links"] = list(
+                    _project._links_by_node.get(self.node_id, [])
+                )
+            else:
+                self.get_links()
 
     @verify_connector_and_id
     def get_links(self):
@@ -802,7 +1760,9 @@ class Node:
         if self.links:
             self.links = []
         for _link in _response.json():
-            self.links.append(Link(connector=self.connector, **_link))
+            self.links.append(
+                _from_api(Link, _compact_link_data(_link), connector=self.connector)
+            )
 
     @verify_connector_and_id
     def start(self):
@@ -910,17 +1870,30 @@ class Node:
 
         This will update the project `auto_close` attribute to `True`
 
+        Inside a `Project.batch` the attributes are only changed locally, and they are
+        sent to the server when the batch ends.
+
         **Required Attributes:**
 
         - `project_id`
         - `connector`
         """
+        _project = getattr(self, "_project", None)
+        if _project is not None and _project._batch is not None:
+            for k, v in kwargs.items():
+                if k in self.__dataclass_fields__:
+                    setattr(self, k, v)
+            _project._batch.setdefault(id(self), (self, {}))[1].update(kwargs)
+            return
+
         _url = (
             f"{self.connector.base_url}/projects/{self.project_id}/nodes/{self.node_id}"
         )
 
         # TODO: Verify that the passed kwargs are supported ones
         _response = self.connector.http_call("put", _url, json_data=kwargs)
+        if "name" in kwargs:
+            self.connector._forget_node_names(self.project_id)
 
         # Update object
         self._update(_response.json())
@@ -933,6 +1906,10 @@ class Node:
         `template` or `template_id` attribute supplied. This can be overriden/updated
         by sending a dictionary of the properties under `extra_properties`.
 
+        The `name`, `x` and `y` attributes are sent on the creation request, and the
+        rest of the attributes set are updated afterwards only if the created node
+        does not have them already.
+
         **Required Node instance attributes:**
 
         - `project_id`
@@ -951,25 +1928,16 @@ class Node:
                 _template = self.connector.get_template(name=self.template)
                 if _template is None:
                     raise ValueError(f"Template {self.template} not found")
-                self.template_id = self.connector.get_template(name=self.template).get(
-                    "template_id"
-                )
+                self.template_id = _template.get("template_id")
             else:
                 raise ValueError("Need either 'template' of 'template_id'")
 
         cached_data = {
-            k: v
-            for k, v in self.__dict__.items()
+            k: getattr(self, k)
+            for k in self.__dataclass_fields__
             if k
-            not in (
-                "project_id",
-                "template",
-                "template_id",
-                "links",
-                "connector",
-                "__initialised__",
-            )
-            if v is not None
+            not in ("project_id", "template", "template_id", "links", "connector")
+            if getattr(self, k) is not None
         }
 
         _url = (
@@ -977,14 +1945,23 @@ class Node:
             f"templates/{self.template_id}"
         )
 
-        _response = self.connector.http_call(
-            "post", _url, json_data=dict(x=0, y=0, compute_id=self.compute_id)
-        )
+        # The template endpoint already takes the name and position of the node
+        _data = dict(x=self.x or 0, y=self.y or 0, compute_id=self.compute_id)
+        if self.name:
+            _data.update(name=self.name)
 
-        self._update(_response.json())
+        _response = self.connector.http_call("post", _url, json_data=_data)
+        _created = _response.json()
+        self.connector._forget_node_names(self.project_id)
 
-        # Update the node attributes based on cached data
-        self.update(**cached_data)
+        self._update(_created)
+
+        # Update the node attributes based on cached data, when still needed
+        _pending = {
+            k: v for k, v in cached_data.items() if _differs(_created.get(k), v)
+        }
+        if _pending:
+            self.update(**_pending)
 
     @verify_connector_and_id
     def delete(self):
@@ -1003,6 +1980,7 @@ class Node:
         )
 
         self.connector.http_call("delete", _url)
+        self.connector._forget_node_names(self.project_id)
 
         self.project_id = None
         self.node_id = None
@@ -1026,6 +2004,50 @@ class Node:
 
         return self.connector.http_call("get", _url).text
 
+    @verify_connector_and_id
+    def iter_file(self, path, chunk_size=CHUNK_SIZE):
+        """
+        Retrieve a file in the node directory as a stream of bytes chunks, so it is
+        never fully held in memory. Binary files are returned as they are.
+
+        Example to save the chunks of a file:
+
+        ```python
+        >>> for chunk in router01.iter_file(path="startup-config.cfg"):
+        ...     output.write(chunk)
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `path`: Node's relative path of the file
+        """
+        _url = (
+            f"{self.connector.base_url}/projects/{self.project_id}/nodes/{self.node_id}"
+            f"/files/{path}"
+        )
+
+        _response = self.connector.http_call("get", _url, stream=True)
+        return _iter_response(_response, chunk_size)
+
+    @verify_connector_and_id
+    def download_file(self, path, dest, chunk_size=CHUNK_SIZE, checksum=None):
+        """
+        Downloads a file in the node directory straight into `dest`, either a file
+        path or a binary file object, in chunks of `chunk_size` bytes. When
+        `checksum` is an algorithm name (like `md5` or `sha256`), the digest of the
+        file is computed while downloading and returned.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `path`: Node's relative path of the file
+        - `dest`: Local file path or binary file object
+        """
+        return _write_chunks(self.iter_file(path, chunk_size), dest, checksum)
+
     @verify_connector_and_id
     def write_file(self, path, data):
         """
@@ -1087,10 +2109,15 @@ class Project:
     - `variables` (list): Variables required to run the project
     - `zoom` (int): Zoom of the drawing area
     - `stats` (dict): Project stats
+    - `snapshots` (list): List of snapshots present on the project
     -.`drawings` (list): List of drawings present on the project
     - `nodes` (list): List of `Node` instances present on the project
     - `links` (list): List of `Link` instances present on the project
 
+    After `get`, the `snapshots`, `drawings`, `nodes` and `links` collections are
+    retrieved lazily the first time they are used. See `refresh`, `invalidate` and
+    `is_stale` to control when they are retrieved again.
+
     **Returns:**
 
     `Project` instance
@@ -1138,22 +2165,159 @@ class Project:
             raise ValueError("status must be opened or closed")
         return value
 
+    def __post_init__(self):
+        # Links indexed by node_id, available once `get_links` has been run
+        self._links_by_node = None
+        # When each collection was last retrieved
+        self._loaded_at = {}
+        # Node updates pending while inside `batch`, by id() of the node
+        self._batch = None
+        # SHA256 of the files written by `push_files`, by node_id and path
+        self._pushed_hashes = {}
+        # Drawing IDs of the zones of `draw_zones`, by zone name
+        self._zones = {}
+        # Drawings by drawing_id, with the `drawings` list they were indexed from
+        self._drawings_by_id = None
+        # Spatial index used to place new nodes, with the `nodes` and `drawings`
+        # lists it was built from
+        self._spatial_index = None
+
+    @contextmanager
+    def batch(self, max_workers=None):
+        """
+        Context manager in which the changes done to the project nodes, either by
+        setting their attributes or with their `update` method, are tracked instead of
+        being sent right away. When it ends, each changed node gets a single update
+        with all its changed attributes, and the updates are sent concurrently by up
+        to `max_workers` (by default the connector's `max_workers`).
+
+        If an exception is raised inside the batch nothing is sent. When some of the
+        updates fail, the rest are still done and a `BatchError` is raised with the
+        node and the exception of each failed one.
+
+        Example:
+
+        ```python
+        >>> with lab.batch():
+        ...     for node in lab.nodes:
+        ...         node.x += 100
+        ...     router01.update(name="router01-CSX", locked=True)
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        """
+        if self._batch is not None:
+            # Nested batch, the outer one sends the updates
+            yield
+            return
+
+        _states = {id(_n): (_n, _node_state(_n)) for _n in self.nodes}
+        self._batch = {}
+        try:
+            yield
+            _pending = self._batch
+        finally:
+            self._batch = None
+
+        _updates = []
+        for _id, (_node, _state) in _states.items():
+            _data = {k: v for k, v in _node_state(_node).items() if _state[k] != v}
+            _data.update(_pending.pop(_id, (_node, {}))[1])
+            if _data:
+                _updates.append((_node, _data))
+        # Nodes that were not in the project when the batch started
+        _updates.extend(_pending.values())
+
+        _errors = []
+        _run_concurrently(
+            lambda _update: _update[0].update(**_update[1]),
+            _updates,
+            max_workers or self.connector.max_workers,
+            errors=_errors,
+        )
+        if _errors:
+            raise BatchError(
+                [(_update[0], _error) for _update, _error in _errors]
+            ) from _errors[0][1]
+
+    def _is_loaded(self, collection):
+        "Whether `collection` holds data, without materialising it"
+        _value = self.__dict__[collection]
+        return not isinstance(_value, _LazyList) or _value.loaded
+
+    def _load(self, collection, lazy):
+        """
+        Retrieves `collection`, used to materialise the `lazy` list the first time it
+        is used. The `lazy` list itself is kept as the collection, so the references
+        to it taken before it was loaded remain the ones of the project.
+        """
+        getattr(self, f"get_{collection}")()
+        _items = self.__dict__[collection]
+        self.__dict__[collection] = lazy
+        return _items
+
+    def invalidate(self, *collections):
+        """
+        Marks the collections (`snapshots`, `drawings`, `nodes` or `links`) as stale,
+        so they are retrieved again the first time they are used. By default all of
+        them.
+        """
+        for _collection in collections or PROJECT_COLLECTIONS:
+            if _collection not in PROJECT_COLLECTIONS:
+                raise ValueError(f"Not a valid collection - {_collection}")
+            self._loaded_at.pop(_collection, None)
+            self.__dict__[_collection] = _LazyList(partial(self._load, _collection))
+            if _collection == "links":
+                self._links_by_node = None
+
+    def is_stale(self, collection, max_age=None):
+        """
+        Returns `True` when `collection` has not been retrieved since the last
+        `invalidate` (or ever), or when it was retrieved more than `max_age` seconds
+        ago
+        """
+        if collection not in PROJECT_COLLECTIONS:
+            raise ValueError(f"Not a valid collection - {collection}")
+        if collection not in self._loaded_at:
+            return True
+        _age = time.time() - self._loaded_at[collection]
+        return max_age is not None and _age > max_age
+
+    def refresh(self, *collections, max_age=None):
+        """
+        Retrieves the collections (`snapshots`, `drawings`, `nodes` or `links`) right
+        away, by default all of them. When `max_age` is given, only the ones that are
+        stale for that amount of seconds are retrieved.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        """
+        for _collection in collections or PROJECT_COLLECTIONS:
+            if max_age is None or self.is_stale(_collection, max_age=max_age):
+                getattr(self, f"get_{_collection}")()
+
     def _update(self, data_dict):
-        for k, v in data_dict.items():
-            if k in self.__dict__.keys():
-                self.__setattr__(k, v)
+        # Only used with server responses, so there is no need to validate again
+        _fields = self.__dataclass_fields__
+        self.__dict__.update((k, v) for k, v in data_dict.items() if k in _fields)
 
     def get(self, get_links=True, get_nodes=True, get_stats=True):
         """
         Retrieves the projects information.
 
-        - `get_links`: When true it also queries for the links inside the project
-        - `get_nodes`: When true it also queries for the nodes inside the project
+        - `get_links`: When true the links inside the project are retrieved again
+        - `get_nodes`: When true the nodes inside the project are retrieved again
         - `get_stats`: When true it also queries for the stats inside the project
 
-        It `get_stats` is set to `True`, it also verifies if snapshots and drawings are
-        inside the project and stores them in their respective attributes
-        (`snapshots` and `drawings`)
+        The links, nodes, snapshots and drawings are not queried here but the first
+        time they are used (see `refresh` to retrieve them right away). If `get_stats`
+        is set to `True`, the snapshots and drawings are only queried when the stats
+        show the project has any.
 
         **Required Attributes:**
 
@@ -1183,16 +2347,18 @@ class Project:
         # Update object
         self._update(_response.json())
 
+        self.invalidate("snapshots", "drawings")
         if get_stats:
             self.get_stats()
-            if self.stats.get("snapshots", 0) > 0:
-                self.get_snapshots()
-            if self.stats.get("drawings", 0) > 0:
-                self.get_drawings()
+            # No need to query for what the project does not have
+            for _collection in ("snapshots", "drawings"):
+                if self.stats.get(_collection, 0) == 0:
+                    self.__dict__[_collection] = []
+                    self._loaded_at[_collection] = time.time()
         if get_nodes:
-            self.get_nodes()
+            self.invalidate("nodes")
         if get_links:
-            self.get_links()
+            self.invalidate("links")
 
     def create(self):
         """
@@ -1211,10 +2377,10 @@ class Project:
         _url = f"{self.connector.base_url}/projects"
 
         data = {
-            k: v
-            for k, v in self.__dict__.items()
-            if k not in ("stats", "nodes", "links", "connector", "__initialised__")
-            if v is not None
+            k: getattr(self, k)
+            for k in self.__dataclass_fields__
+            if k not in ("stats", "nodes", "links", "connector")
+            if getattr(self, k) is not None
         }
 
         _response = self.connector.http_call("post", _url, json_data=data)
@@ -1335,6 +2501,40 @@ class Project:
 
         return self.connector.http_call("get", _url).text
 
+    @verify_connector_and_id
+    def iter_file(self, path, chunk_size=CHUNK_SIZE):
+        """
+        Retrieve a file in the project directory as a stream of bytes chunks, so it
+        is never fully held in memory. Binary files are returned as they are.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `path`: Project's relative path of the file
+        """
+        _url = f"{self.connector.base_url}/projects/{self.project_id}/files/{path}"
+
+        _response = self.connector.http_call("get", _url, stream=True)
+        return _iter_response(_response, chunk_size)
+
+    @verify_connector_and_id
+    def download_file(self, path, dest, chunk_size=CHUNK_SIZE, checksum=None):
+        """
+        Downloads a file in the project directory straight into `dest`, either a
+        file path or a binary file object, in chunks of `chunk_size` bytes. When
+        `checksum` is an algorithm name (like `md5` or `sha256`), the digest of the
+        file is computed while downloading and returned.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `path`: Project's relative path of the file
+        - `dest`: Local file path or binary file object
+        """
+        return _write_chunks(self.iter_file(path, chunk_size), dest, checksum)
+
     @verify_connector_and_id
     def write_file(self, path, data):
         """
@@ -1360,13 +2560,426 @@ class Project:
         """
         _url = f"{self.connector.base_url}/projects/{self.project_id}/files/{path}"
 
-        self.connector.http_call("post", _url, data=data)
+        self.connector.http_call("post", _url, data=data)
+
+    @verify_connector_and_id
+    def export(
+        self,
+        path,
+        include_images=False,
+        include_snapshots=False,
+        reset_mac_addresses=False,
+        compression="zip",
+        chunk_size=CHUNK_SIZE,
+        progress=None,
+        checksum="sha256",
+    ):
+        """
+        Exports the project as a portable archive into the local `path`. The archive
+        is streamed to disk in chunks of `chunk_size` bytes, into a `.part` file
+        which is only renamed to `path` once complete.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `path`: Local path of the archive
+        - `include_images`: Whether to bundle the images of the nodes
+        - `include_snapshots`: Whether to bundle the snapshots
+        - `reset_mac_addresses`: Whether to reset the MAC addresses of the nodes
+        - `compression`: Like `zip`, `bzip2`, `lzma` or `none`. By default is `zip`
+        - `progress`: Optional callable, called as `progress(received, total)` in
+        bytes after each chunk. `total` is `None` when the server doesn't send it
+        - `checksum`: Algorithm of the digest computed while downloading, or `None`
+
+        **Returns**
+
+        Hex digest of the archive, or `None` when no `checksum` is requested
+        """
+        _url = f"{self.connector.base_url}/projects/{self.project_id}/export"
+        _params = dict(
+            include_images="yes" if include_images else "no",
+            include_snapshots="yes" if include_snapshots else "no",
+            reset_mac_addresses="yes" if reset_mac_addresses else "no",
+            compression=compression,
+        )
+
+        _response = self.connector.http_call("get", _url, params=_params, stream=True)
+        _chunks = _iter_response(_response, chunk_size)
+        if progress:
+            _total = _response.headers.get("Content-Length")
+            _chunks = _with_progress(_chunks, progress, _total and int(_total))
+
+        return _write_chunks(_chunks, path, checksum)
+
+    @verify_connector_and_id
+    def backup_files(self, paths_by_node_type, dest, max_workers=None):
+        """
+        Backs up files of the nodes, fetched concurrently, into the `dest` directory.
+        Files are stored by their SHA256 under `objects/`, so the same content is
+        only written once across nodes and runs, and `manifest.json` maps each node
+        name and path to the hash of its file.
+
+        Example to backup the network interfaces of the docker nodes:
+
+        ```python
+        >>> report = lab.backup_files(
+        ...     {"docker": ["/etc/network/interfaces"]}, dest="backups/lab"
+        ... )
+        >>> report["changed"]
+        [('alpine-1', '/etc/network/interfaces')]
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `paths_by_node_type`: Dictionary of the file paths to backup by node type
+        - `dest`: Local directory of the backup
+        - `max_workers`: Number of files fetched at the same time. By default is the
+        `max_workers` of the connector
+
+        **Returns:**
+
+        Dictionary with the `(node name, path)` of the files which `changed` and were
+        `unchanged` since the previous backup, and the `errors` with their message.
+        Files that failed keep their previous hash on the manifest.
+        """
+        _objects = os.path.join(dest, "objects")
+        _manifest_path = os.path.join(dest, "manifest.json")
+        os.makedirs(_objects, exist_ok=True)
+
+        _previous = {}
+        if os.path.exists(_manifest_path):
+            with open(_manifest_path) as _fdata:
+                _previous = json.load(_fdata)["files"]
+
+        _tasks = [
+            (_node, _path)
+            for _node in self.nodes
+            for _path in paths_by_node_type.get(_node.node_type, ())
+        ]
+
+        def _fetch(task):
+            _node, _path = task
+            _fd, _tmp = tempfile.mkstemp(dir=_objects, suffix=".part")
+            try:
+                with os.fdopen(_fd, "wb") as _file:
+                    _digest = _node.download_file(_path, _file, checksum="sha256")
+                _object = os.path.join(_objects, _digest[:2], _digest)
+                if os.path.exists(_object):
+                    os.remove(_tmp)
+                else:
+                    os.makedirs(os.path.dirname(_object), exist_ok=True)
+                    os.replace(_tmp, _object)
+                return _digest
+            except (requests.RequestException, OSError) as err:
+                if os.path.exists(_tmp):
+                    os.remove(_tmp)
+                return err
+
+        _results = _run_concurrently(
+            _fetch, _tasks, max_workers or self.connector.max_workers
+        )
+
+        _files = copy.deepcopy(_previous)
+        _report = dict(changed=[], unchanged=[], errors=[])
+        for (_node, _path), _result in zip(_tasks, _results):
+            if isinstance(_result, Exception):
+                _report["errors"].append((_node.name, _path, str(_result)))
+                continue
+            if _previous.get(_node.name, {}).get(_path) == _result:
+                _report["unchanged"].append((_node.name, _path))
+            else:
+                _report["changed"].append((_node.name, _path))
+            _files.setdefault(_node.name, {})[_path] = _result
+
+        _manifest = dict(
+            project_id=self.project_id,
+            name=self.name,
+            created_at=time.time(),
+            files=_files,
+        )
+        with open(f"{_manifest_path}.part", "w") as _fdata:
+            json.dump(_manifest, _fdata, indent=2, sort_keys=True)
+        os.replace(f"{_manifest_path}.part", _manifest_path)
+        return _report
+
+    @verify_connector_and_id
+    def push_files(
+        self, mapping, max_workers=None, skip_unchanged=True, cache_file=None
+    ):
+        """
+        Writes files on the nodes concurrently. The SHA256 of each file written is
+        remembered, so pushing the same content again to the same node and path is
+        skipped.
+
+        Example to push the network interfaces of a docker node:
+
+        ```python
+        >>> report = lab.push_files(
+        ...     {"alpine-1": {"/etc/network/interfaces": "auto eth0\\n"}}
+        ... )
+        >>> report["alpine-1"]["written"]
+        ['/etc/network/interfaces']
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `mapping`: Dictionary of `{path: data}` dictionaries by node name
+        - `max_workers`: Number of files written at the same time. By default is the
+        `max_workers` of the connector
+        - `skip_unchanged`: Whether to skip the files with the same hash as the last
+        push. By default is `True`
+        - `cache_file`: Optional JSON file to keep the hashes between runs
+
+        **Returns:**
+
+        Dictionary by node name with the paths `written` and `skipped`, and the
+        `errors` with their message by path
+        """
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file) as _fdata:
+                self._pushed_hashes.update(json.load(_fdata))
+
+        _nodes = {_n.name: _n for _n in self.nodes}
+        _missing = [_name for _name in mapping if _name not in _nodes]
+        if _missing:
+            raise ValueError(f"Nodes not found: {', '.join(_missing)}")
+
+        _report = {_name: dict(written=[], skipped=[], errors={}) for _name in mapping}
+        _tasks = []
+        for _name, _files in mapping.items():
+            _hashes = self._pushed_hashes.setdefault(_nodes[_name].node_id, {})
+            for _path, _data in _files.items():
+                _raw = _data.encode() if isinstance(_data, str) else _data
+                _digest = hashlib.sha256(_raw).hexdigest()
+                if skip_unchanged and _hashes.get(_path) == _digest:
+                    _report[_name]["skipped"].append(_path)
+                else:
+                    _tasks.append((_name, _path, _data, _digest))
+
+        def _push(task):
+            _name, _path, _data, _digest = task
+            try:
+                _nodes[_name].write_file(_path, _data)
+            except requests.RequestException as err:
+                return err
+            self._pushed_hashes[_nodes[_name].node_id][_path] = _digest
+
+        try:
+            _results = _run_concurrently(
+                _push, _tasks, max_workers or self.connector.max_workers
+            )
+        finally:
+            # Keep the hashes of the files written, even if others failed
+            if cache_file:
+                with open(cache_file, "w") as _fdata:
+                    json.dump(self._pushed_hashes, _fdata)
+
+        for (_name, _path, _, _), _result in zip(_tasks, _results):
+            if _result is None:
+                _report[_name]["written"].append(_path)
+            else:
+                _report[_name]["errors"][_path] = str(_result)
+        return _report
+
+    @verify_connector_and_id
+    def capture_links(self, links=None, stop=False, max_workers=None, **kwargs):
+        """
+        Starts, or stops when `stop` is `True`, the packet capture on many links
+        concurrently. Extra keyword arguments are passed to `Link.start_capture`.
+        When more than one link is captured, the `link_id` of each one is appended
+        to the `capture_file_name`, like `lab_<link_id>.pcap`, so they don't write
+        to the same file.
+
+        Example to capture the traffic of all the links of a project:
+
+        ```python
+        >>> lab.capture_links()
+        >>> lab.links[0].read_pcap("link.pcap")
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `links`: `Link` instances, link IDs or node name pairs. By default all the
+        project links
+        - `max_workers`: Number of links actioned at the same time. By default is the
+        `max_workers` of the connector
+
+        **Returns:**
+
+        List of the `Link` instances actioned
+        """
+        if links is None:
+            _links = list(self.links)
+        else:
+            _links = [_l for _matched in self._match_links(links) for _l in _matched]
+
+        _file_name = kwargs.pop("capture_file_name", None)
+
+        def _start(link):
+            _name = _file_name
+            if _name and len(_links) > 1:
+                # Each link needs its own capture file
+                _stem, _ext = os.path.splitext(_name)
+                _name = f"{_stem}_{link.link_id}{_ext}"
+            link.start_capture(capture_file_name=_name, **kwargs)
+
+        _action = Link.stop_capture if stop else _start
+        _run_concurrently(_action, _links, max_workers or self.connector.max_workers)
+        return _links
+
+    def _match_links(self, keys):
+        """
+        Returns the links for each of the `keys`: a `Link` instance, a link ID or a
+        pair of node names, which match all the links between those nodes
+        """
+        _names = {_n.node_id: _n.name for _n in self.nodes}
+        _by_id, _by_pair = {}, {}
+        for _l in self.links:
+            _by_id[_l.link_id] = [_l]
+            _pair = frozenset(_names.get(_side["node_id"]) for _side in _l.nodes or ())
+            _by_pair.setdefault(_pair, []).append(_l)
+
+        _matched, _missing = [], []
+        for _key in keys:
+            if isinstance(_key, Link):
+                _matched.append([_key])
+            elif isinstance(_key, str):
+                _matched.append(_by_id.get(_key))
+            else:
+                _matched.append(_by_pair.get(frozenset(_key)))
+            if not _matched[-1]:
+                _missing.append(str(_key))
+        if _missing:
+            raise ValueError(f"Links not found: {', '.join(_missing)}")
+        return _matched
+
+    @verify_connector_and_id
+    def apply_link_filters(self, selector_or_matrix, profile=None, max_workers=None):
+        """
+        Applies packet filters (latency, jitter, packet loss...) to many links at
+        once. Only the links whose current `filters` differ are updated, concurrently.
+
+        `selector_or_matrix` can be:
+
+        - A dictionary (matrix) of the filters to apply by link ID or by pair of node
+        names, like `{("R1", "R2"): {"delay": [50, 10]}}`. A pair matches all the
+        links between those nodes
+        - A callable, which receives each `Link` and returns whether to apply
+        `profile` to it
+        - An iterable of `Link` instances, link IDs or node name pairs to apply
+        `profile` to
+
+        An empty `profile` (`{}`) removes the filters of the links.
+
+        Example to emulate a satellite link between two sites:
+
+        ```python
+        >>> satellite = {"delay": [600, 20], "packet_loss": [2]}
+        >>> lab.apply_link_filters([("hq-rtr", "branch-rtr")], profile=satellite)
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `max_workers`: Number of links updated at the same time. By default is the
+        `max_workers` of the connector
+
+        **Returns:**
+
+        List of the `Link` instances updated
+        """
+        if isinstance(selector_or_matrix, dict):
+            _keys = list(selector_or_matrix)
+            _wanted = [selector_or_matrix[_k] for _k in _keys]
+        else:
+            if profile is None:
+                raise ValueError("Need to submit the filters profile")
+            if callable(selector_or_matrix):
+                _keys = [_l for _l in self.links if selector_or_matrix(_l)]
+            else:
+                _keys = list(selector_or_matrix)
+            _wanted = [profile] * len(_keys)
+
+        _changes = {}
+        for _links, _filters in zip(self._match_links(_keys), _wanted):
+            for _l in _links:
+                if (_l.filters or {}) != (_filters or {}):
+                    _changes[_l.link_id] = (_l, _filters or {})
+
+        _run_concurrently(
+            lambda change: change[0].update(filters=change[1]),
+            _changes.values(),
+            max_workers or self.connector.max_workers,
+        )
+        return [_l for _l, _ in _changes.values()]
+
+    def _index_links(self):
+        """
+        Indexes the project links by their nodes IDs and sets them on the `links`
+        attribute of the respective nodes
+        """
+        self._links_by_node = {}
+        for _link in self.links:
+            for _endpoint in _link.nodes or []:
+                self._links_by_node.setdefault(_endpoint["node_id"], []).append(_link)
+        self._set_nodes_links()
+
+    def _set_nodes_links(self):
+        "Sets the `links` attribute of the nodes from the links index"
+        if self._links_by_node is None or not self._is_loaded("nodes"):
+            return
+        for _node in self.nodes:
+            _node.__dict__["links"] = list(self._links_by_node.get(_node.node_id, []))
+
+    def _patch_objects(self, objects, cls, id_key, payload):
+        """
+        Patches in place the list of `objects` against the server `payload` by their
+        `id_key` and returns the change set
+        """
+        _existing = {getattr(_o, id_key): _o for _o in objects}
+        _changes = {"added": [], "updated": [], "removed": []}
+        _patched = []
+        for _data in payload:
+            _obj = _existing.pop(_data.get(id_key), None)
+            if _obj is None:
+                _obj = _from_api(
+                    cls,
+                    _data,
+                    connector=self.connector,
+                    project_id=self.project_id,
+                    _project=self,
+                )
+                _changes["added"].append(_obj)
+            else:
+                _changed = _patch_fields(_obj, _data)
+                if _changed:
+                    _changes["updated"].append((_obj, _changed))
+            _patched.append(_obj)
+        _kept = {id(_o) for _o in _patched}
+        _changes["removed"] = [_o for _o in objects if id(_o) not in _kept]
+        objects[:] = _patched
+        return _changes
 
     @verify_connector_and_id
-    def get_nodes(self):
+    def get_nodes(self, incremental=False):
         """
         Retrieve the nodes of the project.
 
+        When `incremental` is `True` the current `Node` objects are kept and patched
+        by their `node_id`: changed attributes are updated in place, new nodes are
+        added and the ones no longer present are dropped. It returns the change set:
+
+        `{"added": [Node, ...], "updated": [(Node, [changed_attr, ...]), ...],
+        "removed": [Node, ...]}`
+
         **Required Attributes:**
 
         - `project_id`
@@ -1376,19 +2989,46 @@ class Project:
 
         _response = self.connector.http_call("get", _url)
 
-        # Create the Nodes array but cleanup cache if there is one
-        if self.nodes:
-            self.nodes = []
-        for _node in _response.json():
-            _n = Node(connector=self.connector, **_node)
-            _n.project_id = self.project_id
-            self.nodes.append(_n)
+        if incremental and self._is_loaded("nodes"):
+            self._loaded_at["nodes"] = time.time()
+            _changes = self._patch_objects(
+                self.nodes,
+                Node,
+                "node_id",
+                [_compact_node_data(_node) for _node in _response.json()],
+            )
+            self.connector._index_node_names(self.project_id, self.nodes)
+            self._set_nodes_links()
+            return _changes
+
+        self._loaded_at["nodes"] = time.time()
+        # Create the Nodes array, replacing the previous one
+        self.__dict__["nodes"] = [
+            _from_api(
+                Node,
+                _compact_node_data(_node),
+                connector=self.connector,
+                project_id=self.project_id,
+                _project=self,
+            )
+            for _node in _response.json()
+        ]
+        self.connector._index_node_names(self.project_id, self.nodes)
+        self._set_nodes_links()
 
     @verify_connector_and_id
-    def get_links(self):
+    def get_links(self, incremental=False):
         """
         Retrieve the links of the project.
 
+        The links are also set on the `links` attribute of their respective nodes in
+        `nodes` (and the ones retrieved later on), so refreshing the nodes and their
+        links takes just two requests regardless of the size of the project.
+
+        When `incremental` is `True` the current `Link` objects are patched by their
+        `link_id` instead of being rebuilt, and the change set is returned. See
+        `get_nodes` for its format.
+
         **Required Attributes:**
 
         - `project_id`
@@ -1398,13 +3038,30 @@ class Project:
 
         _response = self.connector.http_call("get", _url)
 
-        # Create the Nodes array but cleanup cache if there is one
-        if self.links:
-            self.links = []
-        for _link in _response.json():
-            _l = Link(connector=self.connector, **_link)
-            _l.project_id = self.project_id
-            self.links.append(_l)
+        if incremental and self._is_loaded("links"):
+            self._loaded_at["links"] = time.time()
+            _changes = self._patch_objects(
+                self.links,
+                Link,
+                "link_id",
+                [_compact_link_data(_link) for _link in _response.json()],
+            )
+            self._index_links()
+            return _changes
+
+        self._loaded_at["links"] = time.time()
+        # Create the Links array, replacing the previous one
+        self.__dict__["links"] = [
+            _from_api(
+                Link,
+                _compact_link_data(_link),
+                connector=self.connector,
+                project_id=self.project_id,
+                _project=self,
+            )
+            for _link in _response.json()
+        ]
+        self._index_links()
 
     @verify_connector_and_id
     def start_nodes(self, poll_wait_time=5):
@@ -1567,6 +3224,29 @@ class Project:
 
         `[(node_a, port_a, node_b, port_b) ...]`
 
+        Use `iter_links_summary` to stream the tuples instead.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        """
+        if is_print:
+            for _a, _pa, _b, _pb in self.iter_links_summary():
+                print(f"{_a}: {_pa} ---- {_b}: {_pb}")
+            return None
+        return list(self.iter_links_summary())
+
+    def iter_links_summary(self):
+        """
+        Yields the summary of each link of the project as a tuple like
+        `(node_a, port_a, node_b, port_b)`, so large projects can be streamed.
+
+        The nodes are indexed by their ID and their ports by `(node_id,
+        adapter_number, port_number)` once, instead of searched for each link. The
+        endpoints not found on the nodes, like the ones of nodes created since they
+        were retrieved, are shown as their `node_id` and `adapter_number/port_number`.
+
         **Required Attributes:**
 
         - `project_id`
@@ -1577,33 +3257,26 @@ class Project:
         if not self.links:
             self.get_links()
 
-        _links_summary = []
+        _names = {}
+        _ports = {}
+        for _n in self.nodes:
+            _names[_n.node_id] = _n.name
+            for _p in _n.ports or ():
+                _key = (_n.node_id, _p["adapter_number"], _p["port_number"])
+                _ports.setdefault(_key, _p["name"])
+
         for _l in self.links:
             if not _l.nodes:
                 continue
-            _side_a = _l.nodes[0]
-            _side_b = _l.nodes[1]
-            _node_a = [x for x in self.nodes if x.node_id == _side_a["node_id"]][0]
-            _port_a = [
-                x["name"]
-                for x in _node_a.ports
-                if x["port_number"] == _side_a["port_number"]
-                and x["adapter_number"] == _side_a["adapter_number"]
-            ][0]
-            _node_b = [x for x in self.nodes if x.node_id == _side_b["node_id"]][0]
-            _port_b = [
-                x["name"]
-                for x in _node_b.ports
-                if x["port_number"] == _side_b["port_number"]
-                and x["adapter_number"] == _side_b["adapter_number"]
-            ][0]
-            endpoint_a = f"{_node_a.name}: {_port_a}"
-            endpoint_b = f"{_node_b.name}: {_port_b}"
-            if is_print:
-                print(f"{endpoint_a} ---- {endpoint_b}")
-            _links_summary.append((_node_a.name, _port_a, _node_b.name, _port_b))
-
-        return _links_summary if not is_print else None
+            _row = []
+            for _side in _l.nodes[:2]:
+                _node_id = _side["node_id"]
+                _adapter, _port = _side["adapter_number"], _side["port_number"]
+                _row.append(_names.get(_node_id, _node_id))
+                _row.append(
+                    _ports.get((_node_id, _adapter, _port), f"{_adapter}/{_port}")
+                )
+            yield tuple(_row)
 
     def _search_node(self, key, value):
         "Performs a search based on a key and value"
@@ -1681,14 +3354,33 @@ class Project:
         **Required keyword aguments:**
 
         - `template` or `template_id`
+
+        When neither `x` nor `y` are given, the node is placed on the free position
+        closest to the center of the canvas, instead of on top of other nodes.
         """
         if not self.nodes:
             self.get_nodes()
 
+        _width, _height = layout_utils.DEFAULT_NODE_SIZE
+        if "x" not in kwargs and "y" not in kwargs:
+            kwargs["x"], kwargs["y"] = self._placement_index().nearest_free(
+                0, 0, _width, _height
+            )
+
         _node = Node(project_id=self.project_id, connector=self.connector, **kwargs)
 
         _node.create()
+        _node._project = self
         self.nodes.append(_node)
+        if self._spatial_index is not None:
+            self._spatial_index[2].insert(
+                _node.node_id,
+                _node.x or 0,
+                _node.y or 0,
+                _node.width or _width,
+                _node.height or _height,
+            )
+        self._set_nodes_links()
         print(
             f"Created: {_node.name} -- Type: {_node.node_type} -- "
             f"Console: {_node.console}"
@@ -1771,6 +3463,7 @@ class Project:
 
         _link.create()
         self.links.append(_link)
+        self._index_links()
         print(f"Created Link-ID: {_link.link_id} -- Type: {_link.link_type}")
 
     def delete_link(self, node_a, port_a, node_b, port_b):
@@ -1832,15 +3525,12 @@ class Project:
             # now to delete the link via GNS3_api
         _link = _matches[0]
         self.links.remove(_link)
+        self._index_links()
         _link_id = _link.link_id
         _link.delete()
         print(
-<<<<<<< HEAD
-            f"Deleted Link-ID: {_link_id} From node {node_a }, port: {port_a} <-->  to node {node_b}, port: {port_b} "
-=======
             f"Deleted Link-ID: {_link_id} From node {node_a }, port: {port_a} <-->  "
             f"to node {node_b}, port: {port_b}"
->>>>>>> 9d8445d2f394b3b39d6bc3040662bb03d1e28b6a
         )
 
     @verify_connector_and_id
@@ -1856,6 +3546,7 @@ class Project:
         _url = f"{self.connector.base_url}/projects/{self.project_id}/snapshots"
 
         response = self.connector.http_call("get", _url)
+        self._loaded_at["snapshots"] = time.time()
         self.snapshots = response.json()
 
     def _search_snapshot(self, key, value):
@@ -1991,17 +3682,173 @@ class Project:
         >>> proj.arrange_nodes()
         ```
         """
+        self.arrange_nodes("circular", radius=radius)
 
-        self.get()
+    @verify_connector_and_id
+    def arrange_nodes(self, layout="grid", max_workers=None, **kwargs):
+        """
+        Re-arranges the existing nodes with one of the layouts of `layout_utils`:
+
+        - `circular`: Nodes on a circle of `radius`
+        - `grid`: Rows of `columns` nodes, `spacing` apart
+        - `tiered`: Rows of nodes by their `node_type`, like clouds on top, then
+        routers, switches and hosts (see `layout_utils.NODE_TYPE_TIERS`). A `tiers`
+        dictionary by node type can be passed to change them
+        - `force`: Force-directed layout over the links of the project, so linked
+        nodes end up close
+
+        Extra keyword arguments are passed to the layout function. The positions are
+        applied within a `batch`, so only the nodes that moved are updated,
+        concurrently.
+
+        **Example**
+
+        ```python
+        >>> lab.arrange_nodes("tiered", spacing_x=200)
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+
+        **Returns:**
+
+        Dictionary of the `(x, y)` positions by node ID
+        """
         if self.status != "opened":
             self.open()
 
-        _angle = (2 * pi) / len(self.nodes)
-        # The Y Axis is inverted in GNS3, so the -Y is UP
-        for index, n in enumerate(self.nodes):
-            _x = int(radius * (sin(_angle * index)))
-            _y = int(radius * (-cos(_angle * index)))
-            n.update(x=_x, y=_y)
+        _ids = [_n.node_id for _n in self.nodes]
+        if layout == "circular":
+            _positions = layout_utils.circular_layout(_ids, **kwargs)
+        elif layout == "grid":
+            _positions = layout_utils.grid_layout(_ids, **kwargs)
+        elif layout == "tiered":
+            _tiers = {**layout_utils.NODE_TYPE_TIERS, **kwargs.pop("tiers", {})}
+            _default = max(_tiers.values(), default=0) + 1
+            _positions = layout_utils.tiered_layout(
+                {_n.node_id: _tiers.get(_n.node_type, _default) for _n in self.nodes},
+                self._link_edges(),
+                **kwargs,
+            )
+        elif layout == "force":
+            kwargs.setdefault(
+                "positions",
+                {_n.node_id: (_n.x, _n.y) for _n in self.nodes if _n.x or _n.y},
+            )
+            _positions = layout_utils.force_layout(_ids, self._link_edges(), **kwargs)
+        else:
+            raise ValueError(f"Not a valid layout - {layout}")
+
+        with self.batch(max_workers=max_workers):
+            for _n in self.nodes:
+                _n.x, _n.y = _positions[_n.node_id]
+        return _positions
+
+    def spatial_index(self, cell_size=100):
+        """
+        Returns a `layout_utils.SpatialIndex` of the bounding boxes of the nodes and
+        drawings of the project, by their `node_id` and `drawing_id`. Useful to find
+        overlapping items, the items on a region of the canvas or a free position.
+
+        Example to find the nodes and drawings overlapping each other:
+
+        ```python
+        >>> lab.spatial_index().overlaps()
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        """
+        _index = layout_utils.SpatialIndex(cell_size)
+        _width, _height = layout_utils.DEFAULT_NODE_SIZE
+        for _n in self.nodes:
+            _index.insert(
+                _n.node_id,
+                _n.x or 0,
+                _n.y or 0,
+                _n.width or _width,
+                _n.height or _height,
+            )
+        for _d in self.drawings or ():
+            _index.insert(_d["drawing_id"], _d["x"], _d["y"], *_svg_size(_d["svg"]))
+        return _index
+
+    def _placement_index(self):
+        """
+        Returns the spatial index of the nodes and drawings used by `create_node`,
+        kept between calls. It is built again when `nodes` or `drawings` are replaced
+        or change their length, or after the drawings are saved or deleted, and the
+        boxes of the nodes that moved are updated.
+        """
+        _nodes, _drawings = self.nodes, self.drawings
+        _cached = self._spatial_index
+        if (
+            _cached is None
+            or _cached[0] is not _nodes
+            or _cached[1] is not _drawings
+            or len(_cached[2]) != len(_nodes) + len(_drawings or ())
+        ):
+            _cached = (_nodes, _drawings, self.spatial_index())
+            self._spatial_index = _cached
+            return _cached[2]
+
+        _index = _cached[2]
+        _width, _height = layout_utils.DEFAULT_NODE_SIZE
+        for _n in _nodes:
+            _box = (_n.x or 0, _n.y or 0, _n.width or _width, _n.height or _height)
+            if _index.box(_n.node_id) != _box:
+                _index.insert(_n.node_id, *_box)
+        return _index
+
+    def drawing_shapes(self, kind=None):
+        """
+        Returns the parsed SVG (`drawing_utils.Svg`) of each drawing by its
+        `drawing_id`. SVGs are parsed once by their content, so it is cheap to call
+        again after the drawings change. The drawings whose SVG is not valid are
+        skipped, printing why.
+
+        Example to find the text of the labels of the project:
+
+        ```python
+        >>> shapes = lab.drawing_shapes(kind=drawing_utils.Text)
+        >>> [shape.text for svg in shapes.values() for shape in svg.shapes]
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `kind`: Only the drawings with a shape of this class, like
+        `drawing_utils.Rect`. By default all of them
+        """
+        if not self.drawings:
+            self.get_drawings()
+
+        _parsed = {}
+        for _d in self.drawings:
+            try:
+                _parsed[_d["drawing_id"]] = drawing_utils.parse_svg(_d["svg"])
+            except ValueError as err:
+                print(f"Skipped drawing: {_d['drawing_id']} -- {err}")
+        if kind is None:
+            return _parsed
+        return {
+            _id: _svg
+            for _id, _svg in _parsed.items()
+            if any(isinstance(_shape, kind) for _shape in _svg.shapes)
+        }
+
+    def _link_edges(self):
+        "Returns the links of the project as pairs of node IDs"
+        return [
+            (_l.nodes[0]["node_id"], _l.nodes[1]["node_id"])
+            for _l in self.links
+            if _l.nodes and len(_l.nodes) == 2
+        ]
 
     def get_drawing(self, drawing_id=None):
         """
@@ -2018,14 +3865,21 @@ class Project:
         if not self.drawings:
             self.get_drawings()
 
-        try:
-            return next(
-                _drawing
-                for _drawing in self.drawings
-                if _drawing["drawing_id"] == drawing_id
-            )
-        except StopIteration:
-            return None
+        return self._drawing_index().get(drawing_id)
+
+    def _drawing_index(self):
+        """
+        Returns the drawings by `drawing_id`. The index is rebuilt when `drawings` is
+        replaced or changes its length outside of the drawing methods.
+        """
+        _drawings = self.drawings or []
+        _cached = self._drawings_by_id
+        if _cached is None or _cached[0] is not _drawings or (
+            len(_cached[1]) != len(_drawings)
+        ):
+            _cached = (_drawings, {_d["drawing_id"]: _d for _d in _drawings})
+            self._drawings_by_id = _cached
+        return _cached[1]
 
     @verify_connector_and_id
     def get_drawings(self):
@@ -2040,6 +3894,7 @@ class Project:
         _url = f"{self.connector.base_url}/projects/{self.project_id}/drawings"
 
         _response = self.connector.http_call("get", _url)
+        self._loaded_at["drawings"] = time.time()
         self.drawings = _response.json()
 
     @verify_connector_and_id
@@ -2052,68 +3907,106 @@ class Project:
         - `project_id`
         - `connector`
         """
-        _url = f"{self.connector.base_url}/projects/{self.project_id}/drawings"
+        _drawing = self._save_drawing(svg=svg, locked=locked, x=x, y=y, z=z)
+        print(f"Created drawing: {_drawing['drawing_id']}")
 
-        response = self.connector.http_call(
-            "post", _url, json_data=dict(svg=svg, locked=locked, x=x, y=y, z=z)
-        )
+    @verify_connector_and_id
+    def create_drawings(self, drawings, max_workers=None):
+        """
+        Creates many drawings concurrently, like the ones generated by
+        `drawing_utils.DrawingBuilder`.
 
-        _drawing = response.json()
+        Example to draw a legend of the node roles:
 
-        self.drawings.append(_drawing)
-        print(f"Created drawing: {_drawing['drawing_id']}")
+        ```python
+        >>> builder = DrawingBuilder().legend(-500, -300, {"core": "#ff9999"})
+        >>> lab.create_drawings(builder.drawings)
+        ```
+
+        **Required Project instance attributes:**
+
+        - `project_id`
+        - `connector`
+
+        **Required keyword aguments:**
+
+        - `drawings`: Dictionaries with the `svg` and the optional `locked`, `x`, `y`
+        and `z` of each drawing
+
+        **Returns:**
+
+        List of the drawings created
+        """
+        if not self.drawings:
+            self.get_drawings()
+
+        return _run_concurrently(
+            lambda drawing: self._save_drawing(
+                **dict(dict(locked=False, x=10, y=10, z=1), **drawing)
+            ),
+            drawings,
+            max_workers or self.connector.max_workers,
+        )
 
     @verify_connector_and_id
     def update_drawing(self, drawing_id, svg=None, locked=None, x=None, y=None, z=None):
         """
-        Updates a drawing on the project
+        Updates a drawing on the project. The attributes not given keep their current
+        values, and the server response is merged on the drawing of `drawings`.
 
         **Required Project instance attributes:**
 
         - `project_id`
         - `connector`
         """
-        _url = (
-            f"{self.connector.base_url}/projects/{self.project_id}/drawings/"
-            f"{drawing_id}"
-        )
+        if not self.drawings:
+            self.get_drawings()
 
-        if svg is None:
-            svg = [
-                draw["svg"]
-                for draw in self.drawings
-                if draw["drawing_id"] == drawing_id
-            ][0]
-
-        if locked is None:
-            locked = [
-                draw["locked"]
-                for draw in self.drawings
-                if draw["drawing_id"] == drawing_id
-            ][0]
-
-        if x is None:
-            x = [
-                draw["x"] for draw in self.drawings if draw["drawing_id"] == drawing_id
-            ][0]
-
-        if y is None:
-            y = [
-                draw["y"] for draw in self.drawings if draw["drawing_id"] == drawing_id
-            ][0]
-
-        if z is None:
-            z = [
-                draw["z"] for draw in self.drawings if draw["drawing_id"] == drawing_id
-            ][0]
-
-        response = self.connector.http_call(
-            "put", _url, json_data=dict(svg=svg, locked=locked, x=x, y=y, z=z)
-        )
+        _current = self._drawing_index().get(drawing_id)
+        if _current is None:
+            raise ValueError("drawing not found")
 
-        self.get_drawings()
+        _data = dict(svg=svg, locked=locked, x=x, y=y, z=z)
+        _data = {k: _current[k] if v is None else v for k, v in _data.items()}
+        return self._save_drawing(drawing_id, **_data)
 
-        return response.json()
+    @verify_connector_and_id
+    def update_drawings(self, updates, max_workers=None):
+        """
+        Updates many drawings concurrently.
+
+        Example to move a couple of drawings:
+
+        ```python
+        >>> lab.update_drawings({drawing_id_1: dict(x=100), drawing_id_2: dict(x=200)})
+        ```
+
+        **Required Project instance attributes:**
+
+        - `project_id`
+        - `connector`
+
+        **Required keyword aguments:**
+
+        - `updates`: Dictionary of the attributes to update by `drawing_id`
+
+        **Returns:**
+
+        List of the drawings updated
+        """
+        if not self.drawings:
+            self.get_drawings()
+
+        _index = self._drawing_index()
+        _missing = [_id for _id in updates if _id not in _index]
+        if _missing:
+            raise ValueError(f"Drawings not found: {', '.join(_missing)}")
+
+        return _run_concurrently(
+            lambda update: self.update_drawing(update[0], **update[1]),
+            updates.items(),
+            max_workers or self.connector.max_workers,
+        )
 
     @verify_connector_and_id
     def delete_drawing(self, drawing_id=None):
@@ -2129,17 +4022,349 @@ class Project:
 
         - `drawing_id`
         """
-        self.get_drawings()
+        self.delete_drawings([drawing_id])
 
-        _drawing = self.get_drawing(drawing_id=drawing_id)
-        if not _drawing:
-            raise ValueError("drawing not found")
+    @verify_connector_and_id
+    def delete_drawings(self, drawing_ids, max_workers=None):
+        """
+        Deletes many drawings of the project concurrently
 
-        _url = (
-            f"{self.connector.base_url}/projects/{self.project_id}/drawings/"
-            f"{_drawing['drawing_id']}"
+        **Required Project instance attributes:**
+
+        - `project_id`
+        - `connector`
+
+        **Required keyword aguments:**
+
+        - `drawing_ids`: IDs of the drawings to delete
+        """
+        if not self.drawings:
+            self.get_drawings()
+
+        _ids = set(drawing_ids)
+        if not _ids <= self._drawing_index().keys():
+            # They may have been created since the drawings were retrieved
+            self.get_drawings()
+            _missing = sorted(_ids - self._drawing_index().keys())
+            if _missing:
+                raise ValueError(f"drawing not found: {', '.join(_missing)}")
+
+        _url = f"{self.connector.base_url}/projects/{self.project_id}/drawings"
+        _run_concurrently(
+            lambda _id: self.connector.http_call("delete", f"{_url}/{_id}"),
+            _ids,
+            max_workers or self.connector.max_workers,
         )
+        self.drawings[:] = [_d for _d in self.drawings if _d["drawing_id"] not in _ids]
+        self._spatial_index = None
 
-        self.connector.http_call("delete", _url)
+    def _save_drawing(self, drawing_id=None, **data):
+        """
+        Creates a drawing, or updates it when `drawing_id` is given, and keeps the
+        server response on `drawings`
+        """
+        _url = f"{self.connector.base_url}/projects/{self.project_id}/drawings"
+        if drawing_id:
+            _response = self.connector.http_call(
+                "put", f"{_url}/{drawing_id}", json_data=data
+            )
+        else:
+            _response = self.connector.http_call("post", _url, json_data=data)
+
+        _drawing = _response.json()
+        # Drawings may be saved concurrently, so the index is built again when used
+        self._spatial_index = None
+        _index = self._drawing_index()
+        _current = _index.get(drawing_id)
+        if _current is not None:
+            _current.update(_drawing)
+            return _current
+
+        self.drawings.append(_drawing)
+        _index[_drawing["drawing_id"]] = _drawing
+        return _drawing
+
+    @verify_connector_and_id
+    def draw_zones(
+        self,
+        groups,
+        padding=40,
+        shape="rectangle",
+        fill="#e6f2ff",
+        fill_opacity=0.5,
+        stroke="#4d88ff",
+        stroke_width=2,
+        z=0,
+        max_workers=None,
+    ):
+        """
+        Draws a zone behind each group of nodes, like the pods or sites of a lab. A
+        zone is the bounding box of its nodes plus `padding`, or the ellipse through
+        the corners of that box.
+
+        The name of each zone is kept in the `data-zone` attribute of its SVG, so
+        running it again, even from another process, finds the drawings of the
+        zones and only creates or updates the ones whose geometry (or style)
+        changed, concurrently.
+
+        Example:
+
+        ```python
+        >>> lab.draw_zones({"site-a": ["R1", "SW1"], "site-b": ["R2", "SW2"]})
+        ```
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        - `groups`: Dictionary of lists of node names by zone name
+        - `shape`: Either `rectangle` or `ellipse`
+        - `max_workers`: Number of drawings saved at the same time. By default is the
+        `max_workers` of the connector
+
+        **Returns:**
+
+        Dictionary of the drawings by zone name
+        """
+        if shape not in ("rectangle", "ellipse"):
+            raise ValueError(f"Not a valid shape - {shape}")
+        _empty = [str(_zone) for _zone, _names in groups.items() if not _names]
+        if _empty:
+            raise ValueError(f"Zones without nodes: {', '.join(_empty)}")
+        _nodes = {_n.name: _n for _n in self.nodes}
+        _missing = [
+            _name
+            for _names in groups.values()
+            for _name in _names
+            if _name not in _nodes
+        ]
+        if _missing:
+            raise ValueError(f"Nodes not found: {', '.join(_missing)}")
+
+        _style = dict(
+            fill=fill,
+            fill_opacity=fill_opacity,
+            stroke=stroke,
+            stroke_width=stroke_width,
+        )
+        _width, _height = layout_utils.DEFAULT_NODE_SIZE
+        _wanted = {}
+        for _zone, _names in groups.items():
+            _group = [_nodes[_name] for _name in _names]
+            _x0 = min(_n.x or 0 for _n in _group) - padding
+            _y0 = min(_n.y or 0 for _n in _group) - padding
+            _x1 = max((_n.x or 0) + (_n.width or _width) for _n in _group) + padding
+            _y1 = max((_n.y or 0) + (_n.height or _height) for _n in _group) + padding
+            if shape == "rectangle":
+                _svg = drawing_utils.generate_rectangle_svg(
+                    height=_y1 - _y0, width=_x1 - _x0, **_style
+                )
+            else:
+                # Same proportions as the box, so it goes through its corners
+                _rx, _ry = round((_x1 - _x0) / sqrt(2)), round((_y1 - _y0) / sqrt(2))
+                _svg = drawing_utils.generate_ellipse_svg(
+                    height=2 * _ry,
+                    width=2 * _rx,
+                    cx=_rx,
+                    cy=_ry,
+                    rx=_rx,
+                    ry=_ry,
+                    **_style,
+                )
+                _x0, _y0 = (_x0 + _x1) // 2 - _rx, (_y0 + _y1) // 2 - _ry
+            _svg = _svg.replace(
+                "<svg ", f'<svg data-zone="{escape(str(_zone))}" ', 1
+            )
+            _wanted[_zone] = dict(svg=_svg, x=_x0, y=_y0, z=z)
+
+        if not self.drawings:
+            self.get_drawings()
+        _drawings = self._drawing_index()
+        _by_name = {}
+        for _drawing in self.drawings:
+            _match = _ZONE_NAME.match(_drawing["svg"])
+            if _match:
+                _by_name.setdefault(unescape(_match.group(1)), _drawing)
+        _zones, _tasks = {}, []
+        for _zone, _data in _wanted.items():
+            _current = _drawings.get(self._zones.get(_zone))
+            if _current is None:
+                _current = _by_name.get(str(_zone))
+            if _current is not None and all(_current[k] == v for k, v in _data.items()):
+                _zones[_zone] = _current
+            else:
+                _tasks.append((_zone, _current and _current["drawing_id"], _data))
+
+        _saved = _run_concurrently(
+            lambda task: self._save_drawing(task[1], **task[2]),
+            _tasks,
+            max_workers or self.connector.max_workers,
+        )
+        for (_zone, _, _), _drawing in zip(_tasks, _saved):
+            _zones[_zone] = _drawing
+        for _zone, _drawing in _zones.items():
+            self._zones[_zone] = _drawing["drawing_id"]
+        return {_zone: _zones[_zone] for _zone in groups}
+
+    def chaos_scheduler(self, max_workers=None):
+        """
+        Returns a `ChaosScheduler` to suspend, resume and change the filters of the
+        project links on a precise schedule.
+
+        **Required Attributes:**
+
+        - `project_id`
+        - `connector`
+        """
+        return ChaosScheduler(self, max_workers=max_workers)
+
+
+# Link changes of each `ChaosScheduler` action, from the event payload
+CHAOS_ACTIONS = {
+    "suspend": lambda payload: dict(suspend=True),
+    "resume": lambda payload: dict(suspend=False),
+    "filters": lambda payload: dict(filters=payload),
+}
+
+
+class ChaosScheduler:
+    """
+    Schedules link events (`suspend`, `resume` and `filters` changes) of a project at
+    precise times. Events are kept on a heap by their deadline, which is relative to
+    the start of `run`, so slow requests never make the later events drift. Due
+    events are dispatched concurrently over the connector, but the events of each
+    link are sent one after the other in their scheduled order, so a slow `suspend`
+    is never overtaken by its `resume`. Each event is recorded on the `events` log.
+
+    **Attributes:**
+
+    - `project` (object): `Project` instance of the links
+    - `max_workers` (int): Maximum amount of concurrent requests. By default is the
+    `max_workers` of the connector
+    - `events` (list): Log of the events dispatched, with the `link_id`, `action`,
+    `payload`, the `scheduled`, `dispatched` and `completed` seconds since the start,
+    and the `error` message if it failed
+
+    **Example:**
+
+    ```python
+    >>> chaos = lab.chaos_scheduler()
+    >>> chaos.flap(("R1", "R2"), period=10, down_time=2, count=30)
+    >>> chaos.schedule(60, ("R2", "R3"), "filters", {"packet_loss": [5]})
+    >>> events = chaos.run()
+    ```
+    """
+
+    def __init__(self, project, max_workers=None):
+        self.project = project
+        self.max_workers = max_workers or project.connector.max_workers
+        self.events = []
+        self._heap = []
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._queues = {}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, delay, link, action, payload=None):
+        """
+        Schedules an `action` on a link `delay` seconds after the start of `run`.
+
+        **Required Attributes:**
+
+        - `delay`: Seconds since the start
+        - `link`: `Link` instance, link ID or pair of node names, which matches all
+        the links between those nodes
+        - `action`: One of `suspend`, `resume` or `filters`
+        - `payload`: The filters to apply with the `filters` action
+        """
+        if action not in CHAOS_ACTIONS:
+            raise ValueError(f"Not a valid action - {action}")
+        if action == "filters" and payload is None:
+            raise ValueError("Need to submit the filters on the payload")
+
+        for _link in self.project._match_links([link])[0]:
+            # The counter keeps the scheduling order of events with the same delay
+            heapq.heappush(self._heap, (delay, self._counter, _link, action, payload))
+            self._counter += 1
+
+    def flap(self, link, period, down_time, count, start=0):
+        """
+        Schedules `count` flaps of a link: it is suspended every `period` seconds
+        from `start`, and resumed `down_time` seconds later.
+        """
+        if not 0 < down_time < period:
+            raise ValueError("down_time must be positive and shorter than period")
+        for _index in range(count):
+            _down = start + _index * period
+            self.schedule(_down, link, "suspend")
+            self.schedule(_down + down_time, link, "resume")
+
+    def stop(self):
+        "Stops `run`, leaving the pending events scheduled"
+        self._stop.set()
+
+    def _dispatch(self, started, event):
+        _delay, _, _link, _action, _payload = event
+        _entry = dict(
+            link_id=_link.link_id,
+            action=_action,
+            payload=_payload,
+            scheduled=_delay,
+            dispatched=time.monotonic() - started,
+            error=None,
+        )
+        try:
+            _link.update(**CHAOS_ACTIONS[_action](_payload))
+        except Exception as err:
+            _entry["error"] = str(err) or type(err).__name__
+        _entry["completed"] = time.monotonic() - started
+        with self._lock:
+            self.events.append(_entry)
+
+    def _enqueue(self, executor, started, event):
+        """
+        Queues a due event on its link. A worker is only submitted when the link has
+        none, otherwise the running one dispatches it after the previous events.
+        """
+        with self._lock:
+            _queue = self._queues.setdefault(event[2].link_id, deque())
+            _queue.append(event)
+            if len(_queue) > 1:
+                return
+        executor.submit(self._drain, started, _queue)
+
+    def _drain(self, started, queue):
+        "Dispatches the events of a link in order, until its queue is empty"
+        while True:
+            with self._lock:
+                _event = queue[0]
+            self._dispatch(started, _event)
+            with self._lock:
+                queue.popleft()
+                if not queue:
+                    return
+
+    def run(self):
+        """
+        Dispatches the scheduled events at their time, until there are no more
+        events or `stop` is called.
+
+        **Returns:**
+
+        The `events` log, sorted by the time they were scheduled for
+        """
+        self._stop.clear()
+        _started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self._heap and not self._stop.is_set():
+                _wait = self._heap[0][0] - (time.monotonic() - _started)
+                if _wait > 0:
+                    self._stop.wait(_wait)
+                    continue
+                self._enqueue(executor, _started, heapq.heappop(self._heap))
 
-        self.get_drawings()
+        self.events.sort(key=lambda e: e["scheduled"])
+        return self.events
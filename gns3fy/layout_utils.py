@@ -0,0 +1,289 @@
+"""
+Functions used as helpers for arranging the nodes of a GNS3 Project.
+
+Each layout receives the node IDs (and the links between them as pairs of node IDs
+when it needs them) and returns a dictionary of `(x, y)` positions by node ID,
+centred on the origin of the canvas. The Y axis is inverted in GNS3, so -Y is up.
+"""
+
+from collections import defaultdict
+from itertools import combinations
+from math import ceil, cos, pi, sin, sqrt
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Position = Tuple[int, int]
+
+# Tier of each node type for `tiered_layout`, from top to bottom of the canvas
+NODE_TYPE_TIERS = {
+    "cloud": 0,
+    "nat": 0,
+    "dynamips": 1,
+    "iou": 1,
+    "qemu": 1,
+    "frame_relay_switch": 2,
+    "atm_switch": 2,
+    "ethernet_switch": 2,
+    "ethernet_hub": 2,
+    "docker": 3,
+    "vpcs": 3,
+    "traceng": 3,
+    "virtualbox": 3,
+    "vmware": 3,
+}
+
+
+def circular_layout(node_ids: Sequence[str], radius: int = 120) -> Dict[str, Position]:
+    _angle = (2 * pi) / max(len(node_ids), 1)
+    return {
+        _id: (int(radius * sin(_angle * index)), int(radius * -cos(_angle * index)))
+        for index, _id in enumerate(node_ids)
+    }
+
+
+def grid_layout(
+    node_ids: Sequence[str], spacing: int = 150, columns: Optional[int] = None
+) -> Dict[str, Position]:
+    "Rows of `columns` nodes, by default as many as needed for a square grid"
+    columns = columns or max(ceil(sqrt(len(node_ids))), 1)
+    rows = ceil(len(node_ids) / columns)
+    _x0 = -(min(columns, len(node_ids)) - 1) * spacing / 2
+    _y0 = -(rows - 1) * spacing / 2
+    return {
+        _id: (
+            int(_x0 + (index % columns) * spacing),
+            int(_y0 + index // columns * spacing),
+        )
+        for index, _id in enumerate(node_ids)
+    }
+
+
+def tiered_layout(
+    tiers: Dict[str, int],
+    edges: Iterable[Tuple[str, str]] = (),
+    spacing_x: int = 150,
+    spacing_y: int = 150,
+) -> Dict[str, Position]:
+    """
+    Rows of nodes by their tier (like `NODE_TYPE_TIERS`), with the first tier on top.
+    Each row is sorted by the average position of the neighbours of its nodes on the
+    rows above (barycenter heuristic), which avoids most crossing links.
+    """
+    _neighbours = defaultdict(list)
+    for _a, _b in edges:
+        _neighbours[_a].append(_b)
+        _neighbours[_b].append(_a)
+
+    _rows: Dict[int, List[str]] = defaultdict(list)
+    for _id, _tier in tiers.items():
+        _rows[_tier].append(_id)
+
+    _order: Dict[str, float] = {}
+    positions = {}
+    _y0 = -(len(_rows) - 1) * spacing_y / 2
+    for _row, _tier in enumerate(sorted(_rows)):
+        _ids = _rows[_tier]
+        _keys = {}
+        for index, _id in enumerate(_ids):
+            _placed = [_order[_n] for _n in _neighbours[_id] if _n in _order]
+            _keys[_id] = sum(_placed) / len(_placed) if _placed else index
+        _ids = sorted(_ids, key=_keys.__getitem__)
+        _x0 = -(len(_ids) - 1) * spacing_x / 2
+        for index, _id in enumerate(_ids):
+            positions[_id] = (int(_x0 + index * spacing_x), int(_y0 + _row * spacing_y))
+            _order[_id] = index - (len(_ids) - 1) / 2
+    return positions
+
+
+def force_layout(
+    node_ids: Sequence[str],
+    edges: Iterable[Tuple[str, str]] = (),
+    spacing: int = 150,
+    iterations: int = 100,
+    positions: Optional[Dict[str, Position]] = None,
+) -> Dict[str, Position]:
+    """
+    Force-directed layout (Fruchterman-Reingold): linked nodes attract each other
+    and all nodes repel, so they settle about `spacing` apart. Repulsion is only
+    computed between nodes of neighbouring cells of a grid that is rebuilt on each
+    iteration (spatial hashing), which keeps every iteration close to linear time.
+
+    Nodes start from the given `positions`, or from a circle, so the result is
+    deterministic.
+    """
+    _count = len(node_ids)
+    if _count == 0:
+        return {}
+    _start = circular_layout(node_ids, radius=int(spacing * _count / (2 * pi)) + 1)
+    if positions:
+        _start.update((_id, positions[_id]) for _id in node_ids if _id in positions)
+    _x = [float(_start[_id][0]) for _id in node_ids]
+    _y = [float(_start[_id][1]) for _id in node_ids]
+    _index = {_id: index for index, _id in enumerate(node_ids)}
+    _edges = [
+        (_index[_a], _index[_b])
+        for _a, _b in edges
+        if _a in _index and _b in _index and _a != _b
+    ]
+
+    _k = float(spacing)
+    _cell = 2 * _k
+    _temperature = _k * sqrt(_count)
+    _cooling = _temperature / (iterations + 1)
+    for _ in range(iterations):
+        _dx = [0.0] * _count
+        _dy = [0.0] * _count
+
+        _grid = defaultdict(list)
+        for i in range(_count):
+            _grid[(int(_x[i] // _cell), int(_y[i] // _cell))].append(i)
+        for (_cx, _cy), _members in _grid.items():
+            _near = [
+                j
+                for _ox in (-1, 0, 1)
+                for _oy in (-1, 0, 1)
+                for j in _grid.get((_cx + _ox, _cy + _oy), ())
+            ]
+            for i in _members:
+                for j in _near:
+                    if i == j:
+                        continue
+                    _ddx, _ddy = _x[i] - _x[j], _y[i] - _y[j]
+                    _dist2 = _ddx * _ddx + _ddy * _ddy
+                    if _dist2 == 0:
+                        # Split overlapping nodes in a stable direction
+                        _ddx, _ddy, _dist2 = float(i - j), 1.0, (i - j) ** 2 + 1.0
+                    _force = _k * _k / _dist2
+                    _dx[i] += _ddx * _force
+                    _dy[i] += _ddy * _force
+
+        for i, j in _edges:
+            _ddx, _ddy = _x[i] - _x[j], _y[i] - _y[j]
+            _dist = sqrt(_ddx * _ddx + _ddy * _ddy) or 1.0
+            _force = _dist / _k
+            _dx[i] -= _ddx * _force
+            _dy[i] -= _ddy * _force
+            _dx[j] += _ddx * _force
+            _dy[j] += _ddy * _force
+
+        for i in range(_count):
+            _length = sqrt(_dx[i] * _dx[i] + _dy[i] * _dy[i])
+            if _length > 0:
+                _step = min(_length, _temperature) / _length
+                _x[i] += _dx[i] * _step
+                _y[i] += _dy[i] * _step
+        _temperature -= _cooling
+
+    _mx, _my = sum(_x) / _count, sum(_y) / _count
+    return {
+        _id: (int(_x[index] - _mx), int(_y[index] - _my))
+        for index, _id in enumerate(node_ids)
+    }
+
+
+# Size of the nodes, for the ones that don't have it yet
+DEFAULT_NODE_SIZE = (60, 60)
+
+
+def _overlap(a: Tuple[float, ...], b: Tuple[float, ...]) -> bool:
+    "Whether two `(x, y, width, height)` boxes overlap. Touching edges don't."
+    return (
+        a[0] < b[0] + b[2]
+        and b[0] < a[0] + a[2]
+        and (a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+    )
+
+
+class SpatialIndex:
+    """
+    Uniform grid of `cell_size` over the bounding boxes of the canvas items (nodes,
+    drawings...) by key. Each box is kept on the cells it covers, so overlap and
+    region queries only check the boxes of the cells involved.
+
+    Boxes are `(x, y, width, height)`, with `x` and `y` on the top left corner like
+    the GNS3 node and drawing positions.
+    """
+
+    def __init__(self, cell_size: int = 100):
+        self.cell_size = cell_size
+        self._boxes: Dict[object, Tuple[float, ...]] = {}
+        self._cells: Dict[Tuple[int, int], set] = defaultdict(set)
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, key):
+        return key in self._boxes
+
+    def _cells_of(self, x, y, width, height):
+        _size = self.cell_size
+        for _cx in range(int(x // _size), int((x + width) // _size) + 1):
+            for _cy in range(int(y // _size), int((y + height) // _size) + 1):
+                yield _cx, _cy
+
+    def box(self, key) -> Optional[Tuple[float, ...]]:
+        "Returns the box of `key`, or `None` when it is not indexed"
+        return self._boxes.get(key)
+
+    def insert(self, key, x, y, width, height):
+        "Adds the box of `key`, replacing its previous one"
+        if key in self._boxes:
+            self.remove(key)
+        self._boxes[key] = (x, y, width, height)
+        for _cell in self._cells_of(x, y, width, height):
+            self._cells[_cell].add(key)
+
+    def remove(self, key):
+        for _cell in self._cells_of(*self._boxes.pop(key)):
+            self._cells[_cell].discard(key)
+            if not self._cells[_cell]:
+                del self._cells[_cell]
+
+    def query(self, x, y, width, height) -> set:
+        "Returns the keys of the boxes overlapping the region"
+        _region = (x, y, width, height)
+        _found = set()
+        for _cell in self._cells_of(x, y, width, height):
+            for _key in self._cells.get(_cell, ()):
+                if _key not in _found and _overlap(self._boxes[_key], _region):
+                    _found.add(_key)
+        return _found
+
+    def overlaps(self) -> List[Tuple[object, object]]:
+        "Returns the pairs of keys whose boxes overlap"
+        _pairs = set()
+        for _keys in self._cells.values():
+            for _a, _b in combinations(_keys, 2):
+                if _overlap(self._boxes[_a], self._boxes[_b]):
+                    _pairs.add((_a, _b) if str(_a) <= str(_b) else (_b, _a))
+        return sorted(_pairs, key=str)
+
+    def nearest_free(
+        self, x, y, width, height, margin: int = 20, max_distance: int = 10_000
+    ) -> Position:
+        """
+        Returns the free position closest to `(x, y)` for a box of `width` and
+        `height`, keeping `margin` around it. Positions are tried on rings of a grid
+        of the box size (plus `margin`) around `(x, y)`.
+        """
+        _step_x, _step_y = width + margin, height + margin
+        _best, _best_distance = None, None
+        for _ring in range(max_distance // min(_step_x, _step_y) + 1):
+            # Positions on further rings are at least this far away
+            if _best is not None and _ring * min(_step_x, _step_y) > _best_distance:
+                break
+            for _i in range(-_ring, _ring + 1):
+                for _j in range(-_ring, _ring + 1):
+                    if max(abs(_i), abs(_j)) != _ring:
+                        continue
+                    _px, _py = x + _i * _step_x, y + _j * _step_y
+                    _distance = sqrt((_px - x) ** 2 + (_py - y) ** 2)
+                    if _best is not None and _distance >= _best_distance:
+                        continue
+                    _region = (_px - margin, _py - margin)
+                    if not self.query(
+                        *_region, width + 2 * margin, height + 2 * margin
+                    ):
+                        _best, _best_distance = (int(_px), int(_py)), _distance
+        if _best is None:
+            raise ValueError("No free position found")
+        return _best
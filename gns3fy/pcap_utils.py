@@ -0,0 +1,192 @@
+"""
+Functions used as helpers for parsing the packet captures of GNS3 Links.
+
+The classic pcap format is read incrementally from chunks of bytes, like the ones of
+`Link.iter_pcap`, so a capture is parsed while it is being received.
+"""
+
+import socket
+from struct import Struct
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+# Magic numbers of the pcap global header, for microsecond and nanosecond timestamps
+PCAP_MAGIC = {0xA1B2C3D4: 1_000_000, 0xA1B23C4D: 1_000_000_000}
+LINKTYPE_ETHERNET = 1
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = (0x8100, 0x88A8)
+
+_GLOBAL_HEADER_SIZE = 24
+_RECORD_HEADER_SIZE = 16
+_U16 = Struct("!H")
+_VLAN = Struct("!HH")
+
+
+class Packet(NamedTuple):
+    """
+    Parsed headers of a captured packet. Layer 2 and 3 attributes are `None` when
+    the frame doesn't have them, and `malformed` is set when they are cut short.
+    """
+
+    timestamp: float
+    length: int
+    captured: int
+    src_mac: Optional[str] = None
+    dst_mac: Optional[str] = None
+    vlan: Optional[int] = None
+    ethertype: Optional[int] = None
+    src_ip: Optional[str] = None
+    dst_ip: Optional[str] = None
+    protocol: Optional[int] = None
+    malformed: bool = False
+
+
+class _Reader(NamedTuple):
+    record: Struct
+    divisor: int
+    linktype: int
+
+
+def _read_global_header(data, pos: int) -> _Reader:
+    for _endian in "<>":
+        _magic, _, _, _, _, _, _linktype = Struct(f"{_endian}IHHiIII").unpack_from(
+            data, pos
+        )
+        if _magic in PCAP_MAGIC:
+            return _Reader(Struct(f"{_endian}IIII"), PCAP_MAGIC[_magic], _linktype)
+    raise ValueError("Not a valid pcap stream")
+
+
+def _mac(data, pos: int) -> str:
+    _end = pos + 6
+    return "%02x:%02x:%02x:%02x:%02x:%02x" % tuple(data[pos:_end])
+
+
+def _ip(family: int, data, pos: int, size: int) -> str:
+    _end = pos + size
+    return socket.inet_ntop(family, data[pos:_end])
+
+
+def _parse_packet(data, pos: int, reader: _Reader) -> Packet:
+    _sec, _frac, _captured, _length = reader.record.unpack_from(data, pos)
+    _timestamp = _sec + _frac / reader.divisor
+    _start = pos + _RECORD_HEADER_SIZE
+    _end = _start + _captured
+    if reader.linktype != LINKTYPE_ETHERNET:
+        return Packet(_timestamp, _length, _captured)
+    if _captured < 14:
+        return Packet(_timestamp, _length, _captured, malformed=True)
+
+    _dst, _src = _mac(data, _start), _mac(data, _start + 6)
+    (_ethertype,) = _U16.unpack_from(data, _start + 12)
+    _pos = _start + 14
+    _vlan = None
+    while _ethertype in ETHERTYPE_VLAN:
+        if _end - _pos < 4:
+            return Packet(
+                _timestamp,
+                _length,
+                _captured,
+                _src,
+                _dst,
+                _vlan,
+                _ethertype,
+                malformed=True,
+            )
+        _tci, _ethertype = _VLAN.unpack_from(data, _pos)
+        if _vlan is None:
+            _vlan = _tci & 0x0FFF
+        _pos += 4
+
+    _src_ip = _dst_ip = _protocol = None
+    _malformed = False
+    if _ethertype == ETHERTYPE_IPV4:
+        if _end - _pos < 20 or data[_pos] >> 4 != 4:
+            _malformed = True
+        else:
+            _protocol = data[_pos + 9]
+            _src_ip = _ip(socket.AF_INET, data, _pos + 12, 4)
+            _dst_ip = _ip(socket.AF_INET, data, _pos + 16, 4)
+    elif _ethertype == ETHERTYPE_IPV6:
+        if _end - _pos < 40 or data[_pos] >> 4 != 6:
+            _malformed = True
+        else:
+            _protocol = data[_pos + 6]
+            _src_ip = _ip(socket.AF_INET6, data, _pos + 8, 16)
+            _dst_ip = _ip(socket.AF_INET6, data, _pos + 24, 16)
+
+    return Packet(
+        _timestamp,
+        _length,
+        _captured,
+        _src,
+        _dst,
+        _vlan,
+        _ethertype,
+        _src_ip,
+        _dst_ip,
+        _protocol,
+        _malformed,
+    )
+
+
+def _record_size(data, pos: int, end: int, reader: Optional[_Reader]) -> int:
+    "Bytes needed for the next record at `pos`, as far as it can be told yet"
+    if reader is None:
+        return _GLOBAL_HEADER_SIZE
+    if end - pos < _RECORD_HEADER_SIZE:
+        return _RECORD_HEADER_SIZE
+    return _RECORD_HEADER_SIZE + reader.record.unpack_from(data, pos)[2]
+
+
+def iter_pcap_packets(chunks: Iterable[bytes]) -> Iterator[Packet]:
+    """
+    Parses a pcap stream given in chunks of bytes of any size, yielding a `Packet`
+    as soon as each one is complete.
+
+    Records are read in place from a `memoryview` of each chunk. Only the record
+    split between two chunks is copied, into a small buffer holding just that one.
+
+    Example to count the packets of a link capture:
+
+    ```python
+    >>> packets = iter_pcap_packets(link.iter_pcap())
+    >>> sum(1 for _ in packets)
+    ```
+    """
+    _reader = None
+    _buffer = bytearray()
+    for _chunk in chunks:
+        _view = memoryview(_chunk)
+        _pos, _end = 0, len(_view)
+
+        # Complete the record split with the previous chunk, taking just its bytes
+        while _buffer:
+            _needed = _record_size(_buffer, 0, len(_buffer), _reader) - len(_buffer)
+            if _needed > 0:
+                if _pos == _end:
+                    break
+                _stop = min(_pos + _needed, _end)
+                _buffer += _view[_pos:_stop]
+                _pos = _stop
+            elif _reader is None:
+                _reader = _read_global_header(_buffer, 0)
+                _buffer.clear()
+            else:
+                yield _parse_packet(_buffer, 0, _reader)
+                _buffer.clear()
+
+        # Then read the complete records in place
+        while _pos < _end:
+            _size = _record_size(_view, _pos, _end, _reader)
+            if _end - _pos < _size:
+                break
+            if _reader is None:
+                _reader = _read_global_header(_view, _pos)
+            else:
+                yield _parse_packet(_view, _pos, _reader)
+            _pos += _size
+
+        if _pos < _end:
+            _buffer += _view[_pos:]
+        _view.release()
@@ -1,8 +1,16 @@
+import pytest
 from gns3fy.drawing_utils import (
+    DrawingBuilder,
+    Ellipse,
+    Line,
+    Rect,
+    Text,
+    _style_template,
     generate_ellipse_svg,
     generate_line_svg,
     generate_rectangle_svg,
     parsed_x,
+    parse_svg,
     parsed_y,
 )
 
@@ -40,3 +48,149 @@ def test_parsed_x():
 def test_parsed_y():
     y_value = parsed_y(y=7)
     assert y_value == -700
+
+
+def test_drawing_builder_rectangles():
+    builder = DrawingBuilder(z=3).rectangles(
+        x=[0, 300], y=10, width=[200, 50.5], height=100, fill="#e6f2ff"
+    )
+    assert builder.drawings == [
+        {
+            "svg": '<svg height="100" width="200"><rect fill="#e6f2ff" '
+            'fill-opacity="1" stroke="#000000" stroke-width="2" height="100" '
+            'width="200"/></svg>',
+            "x": 0,
+            "y": 10,
+            "z": 3,
+        },
+        {
+            "svg": '<svg height="100" width="50.5"><rect fill="#e6f2ff" '
+            'fill-opacity="1" stroke="#000000" stroke-width="2" height="100" '
+            'width="50.5"/></svg>',
+            "x": 300,
+            "y": 10,
+            "z": 3,
+        },
+    ]
+
+
+def test_drawing_builder_ellipses():
+    builder = DrawingBuilder().ellipses(x=0, y=0, width=100, height=50)
+    assert builder.drawings[0]["svg"] == (
+        '<svg height="50" width="100"><ellipse cx="50" cy="25" fill="#ffffff" '
+        'fill-opacity="1" stroke="#000000" stroke-width="2" rx="50" ry="25"/></svg>'
+    )
+
+
+def test_drawing_builder_lines():
+    builder = DrawingBuilder().lines(x1=0, y1=0, x2=[100, 50], y2=[-40, 60])
+    first, second = builder.drawings
+    # Lines are placed on their top left corner
+    assert (first["x"], first["y"]) == (0, -40)
+    assert first["svg"] == (
+        '<svg height="40" width="100"><line stroke="#000000" stroke-width="2" '
+        'x1="0" x2="100" y1="40" y2="0"/></svg>'
+    )
+    assert (second["x"], second["y"]) == (0, 0)
+    assert 'x2="50" y1="0" y2="60"' in second["svg"]
+
+
+def test_drawing_builder_rounds_positions():
+    builder = DrawingBuilder().lines(x1=10.7, y1=-0.6, x2=50, y2=20.5)
+    assert (builder.drawings[0]["x"], builder.drawings[0]["y"]) == (11, -1)
+    builder = DrawingBuilder().rectangles(x=[0.4, -2.5], y=99.99)
+    assert [(d["x"], d["y"]) for d in builder.drawings] == [(0, 100), (-2, 100)]
+
+
+def test_drawing_builder_labels():
+    builder = DrawingBuilder().labels(x=0, y=0, text="R1 & R2")
+    assert builder.drawings[0]["svg"] == (
+        '<svg height="15" width="43"><text fill="#000000" font-family="TypeWriter" '
+        'font-size="10" font-weight="normal">R1 &amp; R2</text></svg>'
+    )
+
+
+def test_drawing_builder_grid_and_legend():
+    builder = DrawingBuilder().grid(0, 0, columns=3, rows=2, cell_width=50)
+    assert len(builder) == 7
+    rows = [(d["x"], d["y"]) for d in builder.drawings[:3]]
+    assert rows == [(0, 0), (0, 100), (0, 200)]
+    assert 'width="150"' in builder.drawings[0]["svg"]
+
+    builder.legend(500, 0, {"core": "#ff0000", "edge": "#00ff00"})
+    assert len(builder) == 11
+    swatch, label = builder.drawings[8], builder.drawings[9]
+    assert (swatch["x"], swatch["y"]) == (500, 30)
+    assert 'fill="#00ff00"' in swatch["svg"]
+    assert (label["x"], label["y"]) == (530, 2)
+    assert ">core</text>" in label["svg"]
+
+
+def test_drawing_builder_templates_cached():
+    _style_template.cache_clear()
+    DrawingBuilder().rectangles(x=list(range(100)), y=0).rectangles(x=0, y=0)
+    assert _style_template.cache_info().misses == 1
+    assert _style_template.cache_info().hits == 1
+
+
+def test_drawing_builder_error_columns_length():
+    with pytest.raises(ValueError, match="Columns must have the same length"):
+        DrawingBuilder().rectangles(x=[0, 1], y=[0, 1, 2])
+
+
+def test_parse_svg():
+    svg = parse_svg(
+        '<svg height="50" width="120"><rect fill="#e6f2ff" height="50" width="120" />'
+        '<line stroke="#000000" stroke-dasharray="4" x1="0" x2="120" y1="25" y2="25"/>'
+        '<text font-family="TypeWriter" font-size="10.0">R1 &amp; R2</text></svg>'
+    )
+    assert (svg.width, svg.height) == (120, 50)
+    assert svg.shapes == (
+        Rect(width=120, height=50, fill="#e6f2ff"),
+        Line(0, 25, 120, 25, stroke="#000000", stroke_dasharray="4"),
+        Text("R1 & R2", font_family="TypeWriter", font_size=10),
+    )
+
+
+def test_parse_svg_ellipse_namespaced():
+    svg = parse_svg(
+        '<svg xmlns="http://www.w3.org/2000/svg" height="20" width="40"><g>'
+        '<ellipse cx="20" cy="10" rx="20" ry="10" /><image height="5" /></g></svg>'
+    )
+    assert svg.shapes == (Ellipse(20, 10, 20, 10),)
+
+
+def test_parse_svg_memoised():
+    svg = DrawingBuilder().rectangles(x=0, y=0).drawings[0]["svg"]
+    assert parse_svg(svg) is parse_svg(svg)
+    assert parse_svg(svg) == parse_svg(generate_rectangle_svg())
+
+
+def test_parse_svg_large_not_memoised():
+    svg = DrawingBuilder().rectangles(x=0, y=0).drawings[0]["svg"]
+    large = svg.replace("</svg>", f"<!-- {'x' * 20000} --></svg>")
+    assert parse_svg(large) == parse_svg(svg)
+    assert parse_svg(large) is not parse_svg(large)
+
+
+def test_error_parse_svg():
+    with pytest.raises(ValueError, match="Not a valid SVG"):
+        parse_svg('<svg height="100"><rect height="100"></svg>')
+    with pytest.raises(ValueError, match="Not a valid SVG"):
+        parse_svg('<svg height="high" />')
+
+
+def test_drawing_builder_escapes_style():
+    builder = DrawingBuilder().rectangles(x=0, y=0, fill="{x}")
+    builder.labels(x=0, y=0, text="{R1}", font_family='A"B')
+    rect, label = builder.drawings
+    assert 'fill="{x}"' in rect["svg"]
+    assert 'font-family="A&quot;B"' in label["svg"]
+    text = parse_svg(label["svg"]).shapes[0]
+    assert (text.text, text.font_family) == ("{R1}", 'A"B')
+
+
+def test_drawing_builder_rounds_numbers():
+    builder = DrawingBuilder().rectangles(x=0, y=0, width=[2.999, 1.5], height=-0.001)
+    assert builder.drawings[0]["svg"].startswith('<svg height="0" width="3">')
+    assert builder.drawings[1]["svg"].startswith('<svg height="0" width="1.5">')
@@ -1,11 +1,21 @@
+import io
+import re
+import copy
 import json
+import itertools
+import threading
+import time
+import hashlib
 import pytest
 import requests
 import requests_mock
 from pathlib import Path
 from pydantic.error_wrappers import ValidationError
 from requests.exceptions import HTTPError
-from gns3fy import Link, Node, Project, Gns3Connector
+from gns3fy import Link, Node, Project, Gns3Connector, ChaosScheduler, BatchError
+from gns3fy import drawing_utils, layout_utils
+from gns3fy.drawing_utils import DrawingBuilder
+from gns3fy.gns3fy import _from_api
 from .data import links, nodes, projects
 
 
@@ -86,6 +96,12 @@ def files_data():
     return data
 
 
+def pcap_data():
+    with open(DATA_FILES / "capture.pcap", "rb") as fdata:
+        data = fdata.read()
+    return data
+
+
 def json_api_test_project():
     "Fetches the API_TEST project response"
     return next((_p for _p in projects_data() if _p["project_id"] == CPROJECT["id"]))
@@ -116,6 +132,8 @@ def post_put_matcher(request):
     resp = requests.Response()
     if request.method == "POST":
         if request.path_url.endswith("/computes/local/qemu/images/files.txt"):
+            # Drain the streamed body, like the server would
+            b"".join(bytes(_chunk) for _chunk in request.body)
             resp.status_code = 204
             return resp
         elif request.path_url.endswith("/projects"):
@@ -143,7 +161,11 @@ def post_put_matcher(request):
         elif request.path_url.endswith(
             f"/{CPROJECT['id']}/templates/{CTEMPLATE['id']}"
         ):
+            _data = request.json()
             _returned = json_api_test_node()
+            _returned.update(x=_data["x"], y=_data["y"], compute_id=_data["compute_id"])
+            if _data.get("name", CNODE["name"]) != CNODE["name"]:
+                _returned.update(name=_data["name"], node_id="NEW_NODE_ID")
             resp.status_code = 201
             resp.json = lambda: _returned
             return resp
@@ -247,6 +269,17 @@ def post_put_matcher(request):
             resp.status_code = 200
             resp.json = lambda: _returned
             return resp
+        elif request.path_url.endswith(("/start_capture", "/stop_capture")):
+            _link_id = request.path_url.split("/")[-2]
+            _returned = next(_l for _l in links_data() if _l["link_id"] == _link_id)
+            if request.path_url.endswith("/start_capture"):
+                _name = (request.json() or {}).get("capture_file_name", "link.pcap")
+                _returned.update(capturing=True, capture_file_name=_name)
+            else:
+                _returned.update(capturing=False, capture_file_name=None)
+            resp.status_code = 201
+            resp.json = lambda: _returned
+            return resp
         elif request.path_url.endswith(f"/{CPROJECT['id']}/links"):
             _data = request.json()
             nodes = _data.get("nodes")
@@ -276,7 +309,14 @@ def post_put_matcher(request):
                 resp.json = lambda: _data
                 return resp
     elif request.method == "PUT":
-        if request.path_url.endswith(f"/{CPROJECT['id']}"):
+        if f"/{CPROJECT['id']}/links/" in request.path_url:
+            _link_id = request.path_url.split("/")[-1]
+            _returned = next(_l for _l in links_data() if _l["link_id"] == _link_id)
+            _returned.update(request.json())
+            resp.status_code = 201
+            resp.json = lambda: _returned
+            return resp
+        elif request.path_url.endswith(f"/{CPROJECT['id']}"):
             _data = request.json()
             _returned = json_api_test_project()
             resp.status_code = 200
@@ -301,6 +341,13 @@ def post_put_matcher(request):
             resp.status_code = 200
             resp.json = lambda: _returned
             return resp
+        elif request.path_url.endswith(f"/{CPROJECT['id']}/nodes/NEW_NODE_ID"):
+            _returned = json_api_test_node()
+            _returned.update(name="alpine-2", node_id="NEW_NODE_ID")
+            _returned.update(request.json())
+            resp.status_code = 200
+            resp.json = lambda: _returned
+            return resp
         # For the arrange_nodes_circular
         elif f"/{CPROJECT['id']}/nodes" in request.path_url:
             # _data = request.json()
@@ -549,6 +596,11 @@ class Gns3ConnectorMock(Gns3Connector):
             f"{self.base_url}/projects/{CPROJECT['id']}/links/{CLINK['id']}",
             status_code=204,
         )
+        self.adapter.register_uri(
+            "GET",
+            f"{self.base_url}/projects/{CPROJECT['id']}/links/{CLINK['id']}/pcap",
+            content=pcap_data(),
+        )
         ##################################
         # POST and PUT matcher endpoints #
         ##################################
@@ -588,6 +640,12 @@ def gns3_server():
     return Gns3ConnectorMock(url=BASE_URL)
 
 
+@pytest.fixture
+def fresh_server():
+    "Server of a single test, for the ones counting requests or changing its data"
+    return Gns3ConnectorMock(url=BASE_URL)
+
+
 class TestGns3Connector:
     def test_get_version(self, gns3_server):
         assert dict(local=True, version="2.2.0") == gns3_server.get_version()
@@ -740,6 +798,36 @@ class TestGns3Connector:
         ):
             gns3_server.get_node(project_id=CPROJECT["id"], node_id="7777-4444-0000")
 
+    def test_get_node_id(self, fresh_server):
+        assert fresh_server.get_node_id(CPROJECT["id"], "alpine-1") == CNODE["id"]
+        assert fresh_server.get_node_id(CPROJECT["id"], "IOU1") == (
+            "de23a89a-aa1f-446a-a950-31d4bf98653c"
+        )
+        # Nodes were retrieved once
+        assert fresh_server.api_calls == 1
+        fresh_server.node_names_ttl = -1
+        fresh_server.get_node_id(CPROJECT["id"], "IOU1")
+        assert fresh_server.api_calls == 2
+
+    def test_get_node_id_after_node_changes(self, fresh_server):
+        def alpine():
+            return Node(
+                node_id=CNODE["id"], connector=fresh_server, project_id=CPROJECT["id"]
+            )
+
+        fresh_server.get_node_id(CPROJECT["id"], "alpine-1")
+        # Renaming or deleting a node drops the cached IDs of its project
+        alpine().update(name="alpine-9")
+        fresh_server.get_node_id(CPROJECT["id"], "alpine-1")
+        assert fresh_server.api_calls == 3
+        alpine().delete()
+        fresh_server.get_node_id(CPROJECT["id"], "alpine-1")
+        assert fresh_server.api_calls == 5
+
+    def test_error_get_node_id_not_found(self, fresh_server):
+        with pytest.raises(ValueError, match="Node not found: dummy"):
+            fresh_server.get_node_id(CPROJECT["id"], "dummy")
+
     def test_get_links(self, gns3_server):
         response = gns3_server.get_links(project_id=CPROJECT["id"])
         assert response[0]["link_type"] == "ethernet"
@@ -773,6 +861,54 @@ class TestGns3Connector:
         response = gns3_server.delete_project(project_id=CPROJECT["id"])
         assert response is None
 
+    def test_import_project(self, fresh_server, tmp_path):
+        archive = tmp_path / "API_TEST.gns3project"
+        archive.write_bytes(b"PK" + bytes(1000))
+        received = {}
+
+        def _import(request, context):
+            received["body"] = b"".join(bytes(_chunk) for _chunk in request.body)
+            return json_api_test_project()
+
+        fresh_server.adapter.register_uri(
+            "POST",
+            re.compile(f"{fresh_server.base_url}/projects/[0-9a-f-]+/import"),
+            json=_import,
+        )
+        progress = []
+        response = fresh_server.import_project(
+            archive,
+            name="API_TEST",
+            chunk_size=400,
+            progress=lambda sent, total: progress.append(sent),
+            checksum=hashlib.sha256(archive.read_bytes()).hexdigest(),
+        )
+        assert response == json_api_test_project()
+        assert received["body"] == archive.read_bytes()
+        assert progress == [400, 800, 1002]
+
+    def test_error_import_project_checksum(self, fresh_server, tmp_path):
+        archive = tmp_path / "API_TEST.gns3project"
+        archive.write_bytes(b"PK" + bytes(1000))
+
+        def _import(request, context):
+            b"".join(bytes(_chunk) for _chunk in request.body)
+            return json_api_test_project()
+
+        fresh_server.adapter.register_uri(
+            "POST",
+            re.compile(f"{fresh_server.base_url}/projects/[0-9a-f-]+/import"),
+            json=_import,
+        )
+        with pytest.raises(ValueError, match="Checksum mismatch for .*: expected 00"):
+            fresh_server.import_project(archive, checksum="00")
+        # The archive is not uploaded
+        assert fresh_server.adapter.call_count == 0
+
+    def test_error_import_project_not_found(self, gns3_server):
+        with pytest.raises(FileNotFoundError, match="Could not find file: dummy"):
+            gns3_server.import_project("dummy")
+
     def test_projects_summary(self, gns3_server):
         projects_summary = gns3_server.projects_summary(is_print=False)
         assert (
@@ -873,7 +1009,86 @@ class TestGns3Connector:
         response = gns3_server.upload_compute_image(
             emulator="qemu", file_path=DATA_FILES / "files.txt"
         )
-        assert response is None
+        assert response == "f9d6800fd075dae47cc16c75b9c9fff5"
+
+    def test_upload_compute_image_progress(self, gns3_server):
+        progress = []
+        gns3_server.upload_compute_image(
+            emulator="qemu",
+            file_path=DATA_FILES / "files.txt",
+            chunk_size=100,
+            progress=lambda sent, total: progress.append((sent, total)),
+        )
+        assert progress == [(sent, 501) for sent in (100, 200, 300, 400, 500, 501)]
+
+    def test_error_upload_compute_image_checksum(self, gns3_server, tmp_path):
+        image = tmp_path / "files.txt"
+        image.write_text("corrupted")
+        with pytest.raises(ValueError, match="Checksum mismatch for files.txt"):
+            gns3_server.upload_compute_image(emulator="qemu", file_path=image)
+        md5 = gns3_server.upload_compute_image(
+            emulator="qemu", file_path=image, verify_checksum=False
+        )
+        assert md5 == hashlib.md5(b"corrupted").hexdigest()
+
+    @pytest.fixture
+    def images_dir(self, fresh_server, tmp_path):
+        "Local images: files.txt is already on the compute while new.qcow2 is not"
+        images = tmp_path / "images"
+        images.mkdir()
+        (images / "files.txt").write_bytes((DATA_FILES / "files.txt").read_bytes())
+        (images / "new.qcow2").write_bytes(b"new image")
+
+        def _drain(request, context):
+            b"".join(bytes(_chunk) for _chunk in request.body)
+            return ""
+
+        _url = f"{fresh_server.base_url}/computes/local/qemu/images"
+        _synced = compute_qemu_images_data() + [
+            dict(filename="new.qcow2", md5sum=hashlib.md5(b"new image").hexdigest())
+        ]
+        fresh_server.adapter.register_uri(
+            "GET",
+            _url,
+            [{"json": compute_qemu_images_data()}, {"json": _synced}],
+        )
+        fresh_server.adapter.register_uri(
+            "POST", f"{_url}/new.qcow2", text=_drain, status_code=204
+        )
+        return images
+
+    def test_images_sync(self, fresh_server, images_dir):
+        progress = []
+        report = fresh_server.images_sync(
+            images_dir,
+            emulator="qemu",
+            bandwidth=10 ** 9,
+            progress=lambda *args: progress.append(args),
+        )
+        assert report["local"] == {"uploaded": ["new.qcow2"], "skipped": ["files.txt"]}
+        assert progress == [("local", "new.qcow2", 9, 9)]
+
+    def test_images_sync_skips_sidecars(self, fresh_server, images_dir):
+        (images_dir / "new.qcow2.md5sum").write_text("md5")
+        (images_dir / ".hidden").write_bytes(b"hidden")
+        report = fresh_server.images_sync(images_dir, emulator="qemu")
+        assert report["local"] == {"uploaded": ["new.qcow2"], "skipped": ["files.txt"]}
+        assert not any(
+            _request.path.endswith(("md5sum", "hidden"))
+            for _request in fresh_server.adapter.request_history
+        )
+
+    def test_images_sync_cached_hashes(self, fresh_server, images_dir, tmp_path):
+        cache_file = tmp_path / "hashes.json"
+        fresh_server.images_sync(images_dir, emulator="qemu", cache_file=cache_file)
+        cached = json.loads(cache_file.read_text())
+        assert cached[str(images_dir / "files.txt")][2] == (
+            "f9d6800fd075dae47cc16c75b9c9fff5"
+        )
+        # A cached hash is trusted while the file size and mtime don't change
+        fresh_server._image_hashes[str(images_dir / "files.txt")][2] = "stale"
+        with pytest.raises(ValueError, match="Checksum mismatch for files.txt"):
+            fresh_server.images_sync(images_dir, emulator="qemu")
 
     def test_get_compute_ports(self, gns3_server):
         response = gns3_server.get_compute_ports(compute_id="local")
@@ -898,6 +1113,10 @@ class TestLink:
         for index, link_data in enumerate(links_data()):
             assert links.LINKS_REPR[index] == repr(Link(**link_data))
 
+    def test_from_api(self):
+        for link_data in links_data():
+            assert Link(**link_data) == _from_api(Link, link_data)
+
     def test_error_instatiation_bad_link_type(self):
         with pytest.raises(ValueError, match="Not a valid link_type - dummy"):
             Link(link_type="dummy")
@@ -977,6 +1196,44 @@ class TestLink:
         with pytest.raises(HTTPError, match="409: Cannot connect to itself"):
             link.create()
 
+    def test_capture(self, api_test_link):
+        api_test_link.start_capture(capture_file_name="alpine.pcap")
+        assert api_test_link.capturing is True
+        assert api_test_link.capture_file_name == "alpine.pcap"
+        api_test_link.stop_capture()
+        assert api_test_link.capturing is False
+        assert api_test_link.capture_file_name is None
+
+    def test_read_pcap(self, api_test_link, tmp_path):
+        dest = tmp_path / "alpine.pcap"
+        digest = api_test_link.read_pcap(dest, chunk_size=64, checksum="md5")
+        assert dest.read_bytes() == pcap_data()
+        assert digest == hashlib.md5(pcap_data()).hexdigest()
+
+    def test_iter_pcap(self, api_test_link):
+        chunks = list(api_test_link.iter_pcap(chunk_size=64))
+        assert [len(chunk) for chunk in chunks] == [64, 64, 64, 64, 44]
+
+    def test_iter_packets(self, api_test_link):
+        packets = api_test_link.iter_packets(chunk_size=10)
+        assert next(packets).src_ip == "10.0.0.1"
+        assert api_test_link.capture_stats["packets"] == 1
+        assert len(list(packets)) == 3
+        assert api_test_link.capture_stats == {
+            "packets": 4,
+            "bytes": 212,
+            "truncated": 0,
+            "malformed": 0,
+            "first_timestamp": 1600000000.001,
+            "last_timestamp": 1600000002.00025,
+            "bps": pytest.approx(212 * 8 / 1.99925),
+        }
+
+    def test_update(self, api_test_link):
+        api_test_link.update(filters={"delay": [50, 10]}, suspend=True)
+        assert api_test_link.filters == {"delay": [50, 10]}
+        assert api_test_link.suspend is True
+
     def test_delete(self, api_test_link):
         api_test_link.delete()
         assert api_test_link.project_id is None
@@ -995,6 +1252,14 @@ class TestNode:
         for index, node_data in enumerate(nodes_data()):
             assert nodes.NODES_REPR[index] == repr(Node(**node_data))
 
+    def test_from_api(self):
+        for node_data in nodes_data():
+            node = _from_api(Node, node_data, connector="SOME_CONN")
+            assert Node(connector="SOME_CONN", **node_data) == node
+        # Assignments are still validated on trusted instances
+        with pytest.raises(ValueError, match="Not a valid status - dummy"):
+            node.status = "dummy"
+
     @pytest.mark.parametrize(
         "param,expected",
         [
@@ -1029,6 +1294,19 @@ class TestNode:
         with pytest.raises(ValueError, match=expected):
             node.get()
 
+    def test_get_by_name_cached(self, fresh_server):
+        for _name in ("alpine-1", "IOU1", "vEOS"):
+            Node(name=_name, connector=fresh_server, project_id=CPROJECT["id"]).get(
+                get_links=False
+            )
+        # The nodes were retrieved once plus one request per node
+        assert fresh_server.api_calls == 4
+
+    def test_error_get_by_name_not_found(self, gns3_server):
+        node = Node(name="dummy", connector=gns3_server, project_id=CPROJECT["id"])
+        with pytest.raises(ValueError, match="Node not found: dummy"):
+            node.get()
+
     def test_get(self, api_test_node):
         api_test_node.get()
         assert "alpine-1" == api_test_node.name
@@ -1080,6 +1358,27 @@ class TestNode:
         assert "alpine:latest" == node.properties["image"]
         assert node.properties["console_http_port"] == 80
 
+    @pytest.mark.parametrize(
+        "param,api_calls",
+        [({"template": CTEMPLATE["name"]}, 2), ({"template_id": CTEMPLATE["id"]}, 1)],
+    )
+    def test_create_single_request(self, param, api_calls, fresh_server):
+        node = Node(
+            name="alpine-2",
+            x=100,
+            y=-50,
+            connector=fresh_server,
+            project_id=CPROJECT["id"],
+            **param,
+        )
+        node.create()
+        assert fresh_server.api_calls == api_calls
+        assert fresh_server.adapter.last_request.json() == dict(
+            name="alpine-2", x=100, y=-50, compute_id="local"
+        )
+        assert node.node_id == "NEW_NODE_ID"
+        assert (node.x, node.y) == (100, -50)
+
     def test_create_override_properties(self, gns3_server):
         node = Node(
             name="alpine-1",
@@ -1160,6 +1459,63 @@ class TestNode:
         with pytest.raises(HTTPError, match="/dummy/path not found"):
             api_test_node.get_file(path="/dummy/path")
 
+    def test_iter_file(self, api_test_node):
+        chunks = list(api_test_node.iter_file("/etc/network/interfaces", chunk_size=8))
+        assert all(len(chunk) <= 8 for chunk in chunks)
+        assert b"".join(chunks) == files_data().encode()
+
+    def test_download_file(self, api_test_node, tmp_path):
+        dest = tmp_path / "interfaces"
+        digest = api_test_node.download_file(
+            "/etc/network/interfaces", dest, checksum="sha256"
+        )
+        assert dest.read_bytes() == files_data().encode()
+        assert digest == hashlib.sha256(files_data().encode()).hexdigest()
+
+    def test_download_binary_file(self, api_test_node):
+        content = bytes(range(256)) * 4
+        api_test_node.connector.adapter.register_uri(
+            "GET",
+            (
+                f"{api_test_node.connector.base_url}/projects/{CPROJECT['id']}/nodes/"
+                f"{CNODE['id']}/files/image.bin"
+            ),
+            content=content,
+        )
+        output = io.BytesIO()
+        assert api_test_node.download_file("image.bin", output, chunk_size=100) is None
+        assert output.getvalue() == content
+
+    def test_error_download_file_wrong_path(self, api_test_node, tmp_path):
+        with pytest.raises(HTTPError, match="/dummy/path not found"):
+            api_test_node.download_file("/dummy/path", tmp_path / "dummy")
+
+    def test_error_download_file_interrupted(self, fresh_server, tmp_path):
+        class _Broken(io.BytesIO):
+            "Body whose connection breaks after its first chunk"
+
+            def read(self, *args, **kwargs):
+                if self.tell():
+                    raise requests.exceptions.ChunkedEncodingError("Connection broken")
+                return super().read(*args, **kwargs)
+
+        fresh_server.adapter.register_uri(
+            "GET",
+            f"{fresh_server.base_url}/projects/{CPROJECT['id']}/nodes/{CNODE['id']}"
+            "/files/image.bin",
+            body=_Broken(bytes(1000)),
+        )
+        node = Node(
+            node_id=CNODE["id"], project_id=CPROJECT["id"], connector=fresh_server
+        )
+        dest = tmp_path / "image.bin"
+        dest.write_bytes(b"previous")
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            node.download_file("image.bin", dest, chunk_size=100)
+        # The previous file is kept, and no partial download is left behind
+        assert list(tmp_path.iterdir()) == [dest]
+        assert dest.read_bytes() == b"previous"
+
     # TODO: Need to make these tests with a "real mocked API" that can accept changes
     def test_write_file(self, api_test_node):
         data = "auto eth0\niface eth0 inet dhcp\n"
@@ -1180,6 +1536,12 @@ def api_test_project(gns3_server):
     return project
 
 
+@pytest.fixture
+def fresh_project(fresh_server):
+    "Project of a single test on `fresh_server`, not retrieved yet"
+    return Project(project_id=CPROJECT["id"], connector=fresh_server)
+
+
 class TestProject:
     def test_instatiation(self):
         for index, project_data in enumerate(projects_data()):
@@ -1224,6 +1586,39 @@ class TestProject:
             "snapshots": 2,
         } == api_test_project.stats
 
+    def test_get_lazy_collections(self, fresh_server, fresh_project):
+        fresh_project.get()
+        # Only the project and its stats
+        assert fresh_server.api_calls == 2
+        assert all(fresh_project.is_stale(_c) for _c in ("nodes", "links", "drawings"))
+        assert "drawings=<not loaded>" in repr(fresh_project)
+        assert fresh_project.nodes[0].name == "Ethernetswitch-1"
+        assert fresh_server.api_calls == 3
+        assert not fresh_project.is_stale("nodes")
+        assert not fresh_project.is_stale("nodes", max_age=3600)
+        assert fresh_project.is_stale("nodes", max_age=-1)
+        # Only the stale collections are retrieved
+        fresh_project.refresh(max_age=3600)
+        assert fresh_server.api_calls == 6
+        fresh_project.refresh("nodes")
+        assert fresh_server.api_calls == 7
+        fresh_project.invalidate("links")
+        assert fresh_project.is_stale("links")
+        assert len(fresh_project.links) == len(links_data())
+        assert fresh_server.api_calls == 8
+
+    def test_lazy_collection_append_after_access(self, fresh_project):
+        fresh_project.get()
+        links = fresh_project.links
+        links.append("X")
+        assert fresh_project.links is links
+        assert fresh_project.links[-1] == "X"
+        assert len(fresh_project.links) == len(links_data()) + 1
+
+    def test_error_invalidate_wrong_collection(self, api_test_project):
+        with pytest.raises(ValueError, match="Not a valid collection - dummy"):
+            api_test_project.invalidate("dummy")
+
     @pytest.mark.parametrize(
         "params,expected",
         [
@@ -1288,12 +1683,174 @@ class TestProject:
             assert n[0] == api_test_project.nodes[index].name
             assert n[1] == api_test_project.nodes[index].node_type
 
+    def test_get_nodes_shares_repeated_data(self, api_test_project):
+        api_test_project.get_nodes()
+        iou1 = api_test_project.get_node(name="IOU1")
+        iou2 = api_test_project.get_node(name="IOU2")
+        assert iou1.ports is iou2.ports
+        assert iou1.node_type is iou2.node_type
+        assert iou1.ports[0]["name"] == "Ethernet0/0"
+        # Shared ports can't be changed in place, only on copies
+        with pytest.raises(TypeError, match="READ only"):
+            iou1.ports[0]["name"] = "dummy"
+        ports = copy.deepcopy(iou1.ports)
+        ports[0]["name"] = "dummy"
+        assert iou2.ports[0]["name"] == "Ethernet0/0"
+        assert json.loads(json.dumps(iou1.ports))[0]["name"] == "Ethernet0/0"
+        # They are still lists, and nested data is READ only as well
+        assert isinstance(iou1.ports, list)
+        assert len(iou1.ports + [{}]) == len(iou2.ports) + 1
+        with pytest.raises(TypeError, match="READ only"):
+            iou1.ports.append({})
+        with pytest.raises(TypeError, match="READ only"):
+            iou1.ports[0]["data_link_types"]["Ethernet"] = "dummy"
+
+    def test_get_node_keeps_shared_ports(self, fresh_project):
+        fresh_project.get_nodes()
+        iou1 = fresh_project.get_node(name="IOU1")
+        iou1.get(get_links=False)
+        assert iou1.ports is fresh_project.get_node(name="IOU2").ports
+        changes = fresh_project.get_nodes(incremental=True)
+        assert changes == {"added": [], "updated": [], "removed": []}
+
+    def test_get_nodes_incremental(self, fresh_server, fresh_project):
+        fresh_project.get_nodes()
+        iou1 = fresh_project.get_node(name="IOU1")
+        # Server side changes: IOU1 stopped, Cloud-1 removed and a new node added
+        _nodes = [_n for _n in nodes_data() if _n["name"] != "Cloud-1"]
+        _nodes[1].update(status="stopped")
+        _nodes.append(dict(_nodes[-1], name="alpine-2", node_id="NEW_NODE_ID"))
+        fresh_server.adapter.register_uri(
+            "GET", f"{BASE_URL}/v2/projects/{CPROJECT['id']}/nodes", json=_nodes
+        )
+        changes = fresh_project.get_nodes(incremental=True)
+        assert [_n.name for _n in changes["added"]] == ["alpine-2"]
+        assert [_n.name for _n in changes["removed"]] == ["Cloud-1"]
+        assert changes["updated"] == [(iou1, ["status"])]
+        assert fresh_project.get_node(name="IOU1") is iou1
+        assert iou1.status == "stopped"
+        assert [_n.name for _n in fresh_project.nodes][-1] == "alpine-2"
+        assert len(fresh_project.nodes) == 6
+
+    def test_get_links_incremental(self, fresh_project):
+        fresh_project.get_links()
+        links_before = list(fresh_project.links)
+        changes = fresh_project.get_links(incremental=True)
+        assert changes == {"added": [], "updated": [], "removed": []}
+        assert all(_a is _b for _a, _b in zip(links_before, fresh_project.links))
+
+    def test_get_links_sets_nodes_links(self, fresh_server, fresh_project):
+        fresh_project.get_nodes()
+        fresh_project.get_links()
+        assert fresh_server.api_calls == 2
+        veos = fresh_project.get_node(name="vEOS")
+        assert [_l.link_id for _l in veos.links] == [
+            _l["link_id"]
+            for _l in links_data()
+            if any(_n["node_id"] == veos.node_id for _n in _l["nodes"])
+        ]
+        assert fresh_project.get_node(name="IOU2").links[0] in fresh_project.links
+        # Refreshing the node reuses the project links
+        veos.get()
+        assert fresh_server.api_calls == 3
+        assert len(veos.links) == 2
+
+    def test_get_node_links_after_invalidate(self, fresh_server, fresh_project):
+        fresh_project.get_nodes()
+        fresh_project.get_links()
+        veos = fresh_project.get_node(name="vEOS")
+        # The links were removed on the server, the project links are now stale
+        fresh_server.adapter.register_uri(
+            "GET",
+            f"{BASE_URL}/v2/projects/{CPROJECT['id']}/nodes/{veos.node_id}/links",
+            json=[],
+        )
+        fresh_project.invalidate("links")
+        veos.get()
+        assert fresh_server.api_calls == 4
+        assert veos.links == []
+        assert fresh_project._links_by_node is None
+
     def test_arrange_nodes_circular(self, api_test_project):
         api_test_project.arrange_nodes_circular()
         for node in api_test_project.nodes:
             assert node.x != 0
             assert node.y != 0
 
+    @pytest.mark.parametrize("layout", ["circular", "grid", "tiered", "force"])
+    def test_arrange_nodes(self, layout, fresh_server, fresh_project):
+        fresh_project.get()
+        positions = fresh_project.arrange_nodes(layout)
+        assert set(positions) == {_n["node_id"] for _n in nodes_data()}
+        assert len(set(positions.values())) == len(positions)
+        puts = [_r for _r in fresh_server.adapter.request_history if _r.method == "PUT"]
+        assert {tuple(_r.json()) for _r in puts} <= {("x", "y"), ("x",), ("y",)}
+
+    def test_arrange_nodes_only_moved(self, fresh_server, fresh_project):
+        fresh_project.get()
+        positions = layout_utils.grid_layout([_n.node_id for _n in fresh_project.nodes])
+        for node in fresh_project.nodes[1:]:
+            node.__dict__.update(zip("xy", positions[node.node_id]))
+        calls = fresh_server.api_calls
+        fresh_project.arrange_nodes("grid")
+        assert fresh_server.api_calls == calls + 1
+
+    def test_error_arrange_nodes_wrong_layout(self, api_test_project):
+        with pytest.raises(ValueError, match="Not a valid layout - dummy"):
+            api_test_project.arrange_nodes("dummy")
+
+    def test_batch(self, fresh_server, fresh_project):
+        fresh_project.get_nodes()
+        alpine = fresh_project.get_node(name="alpine-1")
+        iou1 = fresh_project.get_node(name="IOU1")
+        iou1_id = iou1.node_id
+        with fresh_project.batch():
+            alpine.x = 100
+            alpine.update(y=200)
+            alpine.update(name="alpine-1", y=300)
+            iou1.locked = True
+            iou1.label["text"] = "IOU-1"
+            assert alpine.y == 300
+            assert fresh_server.api_calls == 1
+        # One request per changed node
+        assert fresh_server.api_calls == 3
+        _puts = {
+            _r.url.split("/")[-1]: _r.json()
+            for _r in fresh_server.adapter.request_history
+            if _r.method == "PUT"
+        }
+        assert _puts[CNODE["id"]] == {"x": 100, "y": 300, "name": "alpine-1"}
+        assert _puts[iou1_id]["locked"] is True
+        assert _puts[iou1_id]["label"]["text"] == "IOU-1"
+
+    def test_batch_partial_failure(self, fresh_server, fresh_project):
+        fresh_project.get_nodes()
+        alpine = fresh_project.get_node(name="alpine-1")
+        iou1 = fresh_project.get_node(name="IOU1")
+        fresh_server.adapter.register_uri(
+            "PUT",
+            f"{BASE_URL}/v2/projects/{CPROJECT['id']}/nodes/{iou1.node_id}",
+            json={"message": "Node is locked", "status": 409},
+            status_code=409,
+        )
+        with pytest.raises(BatchError, match=r"Failed operations: IOU1 \(409") as err:
+            with fresh_project.batch():
+                alpine.x = 100
+                iou1.x = 100
+        assert [(_node, type(_error)) for _node, _error in err.value.errors] == [
+            (iou1, HTTPError)
+        ]
+        # The other updates are still sent
+        assert fresh_server.api_calls == 3
+
+    def test_batch_not_sent_on_error(self, fresh_server, fresh_project):
+        fresh_project.get_nodes()
+        with pytest.raises(ValueError, match="Not a valid status - dummy"):
+            with fresh_project.batch():
+                fresh_project.nodes[0].x = 100
+                fresh_project.nodes[0].status = "dummy"
+        assert fresh_server.api_calls == 1
+
     def test_error_get_node_no_required_params(self, api_test_project):
         with pytest.raises(ValueError, match="name or node_ide must be provided"):
             api_test_project.get_node()
@@ -1385,6 +1942,26 @@ class TestProject:
             "'eth0'), ('Cloud-1', 'eth1', 'Ethernetswitch-1', 'Ethernet7')]"
         )
 
+    def test_iter_links_summary(self, api_test_project):
+        rows = api_test_project.iter_links_summary()
+        assert next(rows) == ("IOU1", "Ethernet0/0", "Ethernetswitch-1", "Ethernet1")
+        assert list(rows) == api_test_project.links_summary(is_print=False)[1:]
+
+    def test_iter_links_summary_unknown_endpoints(self, fresh_project):
+        fresh_project.get()
+        iou1 = fresh_project.get_node(name="IOU1")
+        fresh_project.links.append(
+            Link(
+                link_id="NEW_LINK_ID",
+                nodes=[
+                    dict(node_id="NEW_NODE_ID", adapter_number=0, port_number=0),
+                    dict(node_id=iou1.node_id, adapter_number=9, port_number=9),
+                ],
+            )
+        )
+        rows = list(fresh_project.iter_links_summary())
+        assert rows[-1] == ("NEW_NODE_ID", "0/0", "IOU1", "9/9")
+
     def test_links_summary_print(self, capsys, api_test_project):
         api_test_project.nodes = []
         api_test_project.links = []
@@ -1426,6 +2003,45 @@ class TestProject:
         assert alpine2.node_type == "docker"
         assert alpine2.node_id == "NEW_NODE_ID"
 
+    def test_create_node_free_position(self, fresh_project):
+        fresh_project.get()
+        fresh_project.create_node(name="alpine-2", template=CTEMPLATE["name"])
+        alpine2 = fresh_project.get_node(name="alpine-2")
+        assert (alpine2.x, alpine2.y) != (0, 0)
+        index = fresh_project.spatial_index()
+        assert index.query(alpine2.x, alpine2.y, 60, 60) == {alpine2.node_id}
+
+    def test_create_node_reuses_spatial_index(self, fresh_project, monkeypatch):
+        fresh_project.get()
+        index = fresh_project._placement_index()
+        sizes = []
+        monkeypatch.setattr("gns3fy.gns3fy._svg_size", sizes.append)
+        iou1 = fresh_project.get_node(name="IOU1")
+        iou1.x, iou1.y = 500, 500
+        calls = fresh_project.connector.api_calls
+        fresh_project.create_node(name="alpine-2", template=CTEMPLATE["name"])
+        alpine2 = fresh_project.get_node(name="alpine-2")
+        # The index is updated, without retrieving or parsing the drawings again,
+        # so only the template is retrieved before the node is created
+        assert fresh_project._placement_index() is index
+        assert sizes == [] and fresh_project.connector.api_calls == calls + 2
+        assert index.box(iou1.node_id) == (500, 500, 60, 60)
+        assert index.box(alpine2.node_id) == (alpine2.x, alpine2.y, 60, 60)
+
+    def test_spatial_index(self, fresh_project):
+        fresh_project.get()
+        index = fresh_project.spatial_index()
+        assert len(index) == 8
+        # The ellipse drawing is 200x200 at (-383, 14) and IOU2 60x60 at (-183, 6)
+        assert index.query(-383, 14, 200, 200) == {
+            "622224a0-1ed4-4d7b-a263-89cebe511432"
+        }
+        assert index.query(-190, 0, 10, 10) == {"0d10d697-ef8d-40af-a4f3-fafe71f5458b"}
+        # The rectangle drawing ends 2 pixels inside of IOU1
+        assert index.overlaps() == [
+            (CDRAWING["id"], "de23a89a-aa1f-446a-a950-31d4bf98653c")
+        ]
+
     def test_create_link(self, api_test_project):
         api_test_project.nodes = []
         api_test_project.links = []
@@ -1439,10 +2055,7 @@ class TestProject:
         api_test_project.create_link("IOU1", "Ethernet1/1", "vEOS", "Ethernet2")
         link = api_test_project.get_link(link_id="NEW_LINK_ID")
         api_test_project.delete_link("IOU1", "Ethernet1/1", "vEOS", "Ethernet2")
-<<<<<<< HEAD
-=======
         assert link is not None
->>>>>>> 9d8445d2f394b3b39d6bc3040662bb03d1e28b6a
         assert api_test_project.get_link(link_id="NEW_LINK_ID") is None
 
     @pytest.mark.parametrize(
@@ -1478,12 +2091,315 @@ class TestProject:
         with pytest.raises(HTTPError, match="Not found"):
             api_test_project.get_file(path="/dummy/path")
 
+    def test_iter_file(self, api_test_project):
+        chunks = list(api_test_project.iter_file("README.txt", chunk_size=4))
+        assert b"".join(chunks) == b"\nThis is a README\n"
+
+    def test_download_file(self, api_test_project):
+        output = io.BytesIO()
+        digest = api_test_project.download_file("README.txt", output, checksum="md5")
+        assert output.getvalue() == b"\nThis is a README\n"
+        assert digest == hashlib.md5(b"\nThis is a README\n").hexdigest()
+
+    def test_error_download_file_wrong_path(self, api_test_project):
+        with pytest.raises(HTTPError, match="Not found"):
+            api_test_project.download_file("/dummy/path", io.BytesIO())
+
     # TODO: Need to make these tests with a "real mocked API" that can accept changes
     def test_write_file(self, api_test_project):
         data = "NEW README INFO!\n"
         r = api_test_project.write_file(path="README.txt", data=data)
         assert r is None
 
+    def test_export(self, api_test_project, tmp_path):
+        content = b"PK" + bytes(range(256)) * 10
+        api_test_project.connector.adapter.register_uri(
+            "GET",
+            f"{api_test_project.connector.base_url}/projects/{CPROJECT['id']}/export",
+            content=content,
+            headers={"Content-Length": str(len(content))},
+        )
+        archive = tmp_path / "API_TEST.gns3project"
+        progress = []
+        digest = api_test_project.export(
+            archive,
+            include_images=True,
+            chunk_size=1000,
+            progress=lambda received, total: progress.append((received, total)),
+        )
+        assert archive.read_bytes() == content
+        assert digest == hashlib.sha256(content).hexdigest()
+        assert progress == [(1000, 2562), (2000, 2562), (2562, 2562)]
+        assert not (tmp_path / "API_TEST.gns3project.part").exists()
+
+    def test_error_export_interrupted(self, api_test_project, tmp_path):
+        def _broken(request, context):
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+        api_test_project.connector.adapter.register_uri(
+            "GET",
+            f"{api_test_project.connector.base_url}/projects/{CPROJECT['id']}/export",
+            body=_broken,
+        )
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            api_test_project.export(tmp_path / "API_TEST.gns3project")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_backup_files(self, api_test_project, tmp_path):
+        connector = api_test_project.connector
+        _url = f"{connector.base_url}/projects/{CPROJECT['id']}/nodes"
+        iou_nodes = [n for n in api_test_project.nodes if n.node_type == "iou"]
+        for node in iou_nodes:
+            connector.adapter.register_uri(
+                "GET", f"{_url}/{node.node_id}/files/startup.cfg", text="hostname R\n"
+            )
+        paths = {
+            "docker": ["/etc/network/interfaces", "/dummy/path"],
+            "iou": ["startup.cfg"],
+        }
+        report = api_test_project.backup_files(paths, dest=tmp_path)
+        assert report["changed"] == [
+            ("IOU1", "startup.cfg"),
+            ("IOU2", "startup.cfg"),
+            ("alpine-1", "/etc/network/interfaces"),
+        ]
+        assert report["unchanged"] == []
+        assert report["errors"][0][:2] == ("alpine-1", "/dummy/path")
+        # Same content is only stored once
+        objects = [p for p in (tmp_path / "objects").rglob("*") if p.is_file()]
+        assert len(objects) == 2
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        digest = manifest["files"]["IOU2"]["startup.cfg"]
+        assert (tmp_path / "objects" / digest[:2] / digest).read_text() == (
+            "hostname R\n"
+        )
+
+        connector.adapter.register_uri(
+            "GET",
+            f"{_url}/{iou_nodes[1].node_id}/files/startup.cfg",
+            text="hostname R2\n",
+        )
+        report = api_test_project.backup_files(paths, dest=tmp_path)
+        assert report["changed"] == [("IOU2", "startup.cfg")]
+        assert report["unchanged"] == [
+            ("IOU1", "startup.cfg"),
+            ("alpine-1", "/etc/network/interfaces"),
+        ]
+        assert len([p for p in (tmp_path / "objects").rglob("*") if p.is_file()]) == 3
+
+    def test_backup_files_connection_error(self, fresh_server, fresh_project, tmp_path):
+        _url = f"{fresh_server.base_url}/projects/{CPROJECT['id']}/nodes"
+        iou1 = fresh_project.get_node(name="IOU1")
+        iou2 = fresh_project.get_node(name="IOU2")
+        fresh_server.adapter.register_uri(
+            "GET",
+            f"{_url}/{iou1.node_id}/files/startup.cfg",
+            exc=requests.exceptions.ConnectTimeout,
+        )
+        fresh_server.adapter.register_uri(
+            "GET", f"{_url}/{iou2.node_id}/files/startup.cfg", text="hostname R\n"
+        )
+        report = fresh_project.backup_files({"iou": ["startup.cfg"]}, dest=tmp_path)
+        # The unreachable node is reported without stopping the backup
+        assert report["changed"] == [("IOU2", "startup.cfg")]
+        assert [error[:2] for error in report["errors"]] == [("IOU1", "startup.cfg")]
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        assert list(manifest["files"]) == ["IOU2"]
+
+    def test_push_files(self, api_test_project, tmp_path):
+        connector = api_test_project.connector
+        _url = f"{connector.base_url}/projects/{CPROJECT['id']}/nodes"
+        iou1, iou2 = [n for n in api_test_project.nodes if n.node_type == "iou"]
+        connector.adapter.register_uri(
+            "POST", f"{_url}/{iou1.node_id}/files/startup.cfg", status_code=201
+        )
+        connector.adapter.register_uri(
+            "POST",
+            f"{_url}/{iou2.node_id}/files/startup.cfg",
+            json={"message": "Node is not running", "status": 409},
+            status_code=409,
+        )
+        mapping = {
+            "alpine-1": {"/etc/network/interfaces": "auto eth0\n"},
+            "IOU1": {"startup.cfg": b"hostname IOU1\n"},
+            "IOU2": {"startup.cfg": "hostname IOU2\n"},
+        }
+        cache_file = tmp_path / "pushed.json"
+        report = api_test_project.push_files(mapping, cache_file=cache_file)
+        assert report["alpine-1"] == {
+            "written": ["/etc/network/interfaces"],
+            "skipped": [],
+            "errors": {},
+        }
+        assert report["IOU1"]["written"] == ["startup.cfg"]
+        assert "Node is not running" in report["IOU2"]["errors"]["startup.cfg"]
+
+        # Unchanged files are skipped, also with the hashes of a previous run
+        project = Project(name="API_TEST", connector=connector)
+        project.get()
+        mapping["alpine-1"]["/etc/network/interfaces"] = "auto eth1\n"
+        report = project.push_files(mapping, cache_file=cache_file)
+        assert report["alpine-1"]["written"] == ["/etc/network/interfaces"]
+        assert report["IOU1"]["skipped"] == ["startup.cfg"]
+        assert report["IOU2"]["skipped"] == []
+        report = project.push_files(mapping, skip_unchanged=False)
+        assert report["IOU1"]["written"] == ["startup.cfg"]
+
+    def test_push_files_connection_error(self, fresh_server, fresh_project, tmp_path):
+        iou1 = fresh_project.get_node(name="IOU1")
+        fresh_server.adapter.register_uri(
+            "POST",
+            f"{fresh_server.base_url}/projects/{CPROJECT['id']}/nodes/"
+            f"{iou1.node_id}/files/startup.cfg",
+            exc=requests.exceptions.ConnectionError,
+        )
+        mapping = {
+            "alpine-1": {"/etc/network/interfaces": "auto eth0\n"},
+            "IOU1": {"startup.cfg": "hostname IOU1\n"},
+        }
+        cache_file = tmp_path / "pushed.json"
+        report = fresh_project.push_files(mapping, cache_file=cache_file)
+        assert report["alpine-1"]["written"] == ["/etc/network/interfaces"]
+        assert list(report["IOU1"]["errors"]) == ["startup.cfg"]
+        # Only the files written are remembered
+        assert json.loads(cache_file.read_text()) == {
+            CNODE["id"]: {
+                "/etc/network/interfaces": hashlib.sha256(b"auto eth0\n").hexdigest()
+            },
+            iou1.node_id: {},
+        }
+
+    def test_error_push_files_node_not_found(self, api_test_project):
+        with pytest.raises(ValueError, match="Nodes not found: dummy"):
+            api_test_project.push_files({"dummy": {"startup.cfg": ""}})
+
+    def test_capture_links(self, api_test_project):
+        history = api_test_project.connector.adapter.request_history
+        start = len(history)
+        links = api_test_project.capture_links(capture_file_name="lab.pcap")
+        assert len(links) == len(links_data())
+        # Each link captures to its own file
+        assert sorted(_r.json()["capture_file_name"] for _r in history[start:]) == (
+            sorted(f"lab_{_l['link_id']}.pcap" for _l in links_data())
+        )
+        api_test_project.capture_links([CLINK["id"]], capture_file_name="one.pcap")
+        assert history[-1].json() == {"capture_file_name": "one.pcap"}
+        assert all(_l.capturing for _l in api_test_project.links)
+        api_test_project.capture_links([CLINK["id"]], stop=True)
+        assert [_l.link_id for _l in api_test_project.links if not _l.capturing] == [
+            CLINK["id"]
+        ]
+
+    def test_apply_link_filters(self, api_test_project):
+        wan = {"delay": [50, 10], "packet_loss": [1]}
+        changed = api_test_project.apply_link_filters(
+            lambda link: len(link.nodes) == 2, profile=wan
+        )
+        assert len(changed) == 5
+        assert [_l.filters for _l in api_test_project.links if _l.nodes] == [wan] * 5
+
+        # Only the links with different filters are updated
+        calls = api_test_project.connector.api_calls
+        changed = api_test_project.apply_link_filters(
+            {
+                ("IOU2", "IOU1"): wan,
+                CLINK["id"]: {"corrupt": [5]},
+                ("vEOS", "Ethernetswitch-1"): {},
+            }
+        )
+        assert api_test_project.connector.api_calls == calls + 2
+        assert [_l.filters for _l in changed] == [{"corrupt": [5]}, {}]
+
+    def test_error_apply_link_filters(self, api_test_project):
+        with pytest.raises(ValueError, match="Links not found: dummy, .*IOU1"):
+            api_test_project.apply_link_filters(["dummy", ("IOU1", "vEOS")], profile={})
+        with pytest.raises(ValueError, match="Need to submit the filters profile"):
+            api_test_project.apply_link_filters([CLINK["id"]])
+
+    def test_error_capture_links_not_found(self, api_test_project):
+        with pytest.raises(ValueError, match="Links not found: dummy"):
+            api_test_project.capture_links(["dummy"])
+
+    def test_chaos_scheduler(self, api_test_project):
+        chaos = api_test_project.chaos_scheduler()
+        assert isinstance(chaos, ChaosScheduler)
+        chaos.flap(("vEOS", "alpine-1"), period=0.04, down_time=0.02, count=2)
+        chaos.schedule(0.01, ("IOU1", "IOU2"), "filters", {"delay": [50, 10]})
+        assert len(chaos) == 5
+        events = chaos.run()
+        assert len(chaos) == 0
+        assert [(e["scheduled"], e["action"]) for e in events] == [
+            (0, "suspend"),
+            (0.01, "filters"),
+            (0.02, "resume"),
+            (0.04, "suspend"),
+            (0.06, "resume"),
+        ]
+        for event in events:
+            assert event["dispatched"] >= event["scheduled"]
+            assert event["completed"] >= event["dispatched"]
+            assert event["error"] is None
+        assert events[1]["payload"] == {"delay": [50, 10]}
+        assert events[0]["link_id"] == CLINK["id"]
+
+    def test_chaos_scheduler_link_order(self, fresh_server, fresh_project):
+        sent = []
+
+        def _update(request, context):
+            # The suspend takes longer than the time the link is down
+            if request.json()["suspend"]:
+                time.sleep(0.05)
+            sent.append(request.json()["suspend"])
+            return dict(json_api_test_link(), **request.json())
+
+        fresh_server.adapter.register_uri(
+            "PUT",
+            f"{fresh_server.base_url}/projects/{CPROJECT['id']}/links/{CLINK['id']}",
+            json=_update,
+        )
+        fresh_project.get()
+        chaos = fresh_project.chaos_scheduler()
+        chaos.flap(CLINK["id"], period=0.04, down_time=0.01, count=2)
+        events = chaos.run()
+        assert sent == [True, False, True, False]
+        assert [e["action"] for e in sorted(events, key=lambda e: e["completed"])] == [
+            "suspend",
+            "resume",
+            "suspend",
+            "resume",
+        ]
+
+    def test_chaos_scheduler_records_errors(self, fresh_server, fresh_project):
+        fresh_server.adapter.register_uri(
+            "PUT",
+            f"{fresh_server.base_url}/projects/{CPROJECT['id']}/links/{CLINK['id']}",
+            exc=RuntimeError("unexpected"),
+        )
+        fresh_project.get()
+        chaos = fresh_project.chaos_scheduler()
+        chaos.schedule(0, CLINK["id"], "suspend")
+        assert [e["error"] for e in chaos.run()] == ["unexpected"]
+
+    def test_chaos_scheduler_stop(self, api_test_project):
+        chaos = api_test_project.chaos_scheduler()
+        chaos.schedule(0, CLINK["id"], "suspend")
+        chaos.schedule(60, CLINK["id"], "resume")
+        threading.Timer(0.05, chaos.stop).start()
+        assert [e["action"] for e in chaos.run()] == ["suspend"]
+        assert len(chaos) == 1
+
+    @pytest.mark.parametrize(
+        "event,expected",
+        [
+            ((0, CLINK["id"], "dummy"), "Not a valid action - dummy"),
+            ((0, CLINK["id"], "filters"), "Need to submit the filters on the payload"),
+            ((0, "dummy", "resume"), "Links not found: dummy"),
+        ],
+    )
+    def test_error_chaos_scheduler_schedule(self, api_test_project, event, expected):
+        with pytest.raises(ValueError, match=expected):
+            api_test_project.chaos_scheduler().schedule(*event)
+
     def test_get_snapshots(self, api_test_project):
         api_test_project.get_snapshots()
         assert isinstance(api_test_project.snapshots, list)
@@ -1591,6 +2507,166 @@ class TestProject:
         assert api_test_project.drawings[0]["x"] == -256
         assert api_test_project.drawings[0]["drawing_id"] == CDRAWING["id"]
 
+    @pytest.fixture
+    def zones_project(self, fresh_project):
+        "Project whose server saves the drawings as they are sent"
+        connector = fresh_project.connector
+        _url = f"{connector.base_url}/projects/{CPROJECT['id']}/drawings"
+        _ids = itertools.count()
+
+        def _save(request, context):
+            _id = request.path_url.split("/")[-1]
+            if _id == "drawings":
+                _id = f"ZONE-{next(_ids)}"
+            return dict(request.json(), drawing_id=_id, locked=False, rotation=0)
+
+        connector.adapter.register_uri("POST", _url, json=_save, status_code=201)
+        connector.adapter.register_uri(
+            "PUT", re.compile(f"{_url}/ZONE-"), json=_save, status_code=201
+        )
+        connector.adapter.register_uri(
+            "DELETE", re.compile(f"{_url}/ZONE-"), status_code=204
+        )
+        fresh_project.get()
+        return fresh_project
+
+    def test_draw_zones(self, zones_project):
+        groups = {"site-a": ["IOU1", "IOU2"], "site-b": ["vEOS", "alpine-1"]}
+        zones = zones_project.draw_zones(groups, padding=20)
+        svg_b = zones["site-b"]["svg"]
+        # IOU1 is at (-184, -139) and IOU2 at (-183, 6), both 60x60
+        assert (zones["site-a"]["x"], zones["site-a"]["y"]) == (-204, -159)
+        assert zones["site-a"]["svg"].startswith(
+            '<svg data-zone="site-a" height="245" width="101">'
+        )
+        assert zones["site-a"] in zones_project.drawings
+        assert len(zones_project.drawings) == 4
+
+        # Only the zones whose geometry changed are saved again
+        calls = zones_project.connector.api_calls
+        zones_project.get_node(name="alpine-1").x += 100
+        again = zones_project.draw_zones(groups, padding=20)
+        assert zones_project.connector.api_calls == calls + 1
+        assert again["site-a"] == zones["site-a"]
+        assert again["site-b"]["drawing_id"] == zones["site-b"]["drawing_id"]
+        assert again["site-b"]["svg"] != svg_b
+        assert len(zones_project.drawings) == 4
+
+        # Zones are found again by the name kept in their SVG
+        zones_project._zones.clear()
+        zones_project.draw_zones(groups, padding=20)
+        assert zones_project.connector.api_calls == calls + 1
+
+    def test_draw_zones_other_process(self, zones_project):
+        groups = {"a&b": ["IOU1", "IOU2"]}
+        zone = zones_project.draw_zones(groups)["a&b"]
+        assert 'data-zone="a&amp;b"' in zone["svg"]
+        # Another project instance, retrieving the drawings, after a node moved
+        project = Project(project_id=CPROJECT["id"], connector=zones_project.connector)
+        project.get_nodes()
+        project.drawings = copy.deepcopy(zones_project.drawings)
+        project.get_node(name="IOU1").x -= 100
+        again = project.draw_zones(groups)["a&b"]
+        assert again["drawing_id"] == zone["drawing_id"]
+        assert again["x"] == zone["x"] - 100
+        assert len(project.drawings) == len(zones_project.drawings)
+
+    def test_update_drawings(self, zones_project):
+        zones = zones_project.draw_zones({"a": ["IOU1"], "b": ["IOU2"], "c": ["vEOS"]})
+        ids = [zone["drawing_id"] for zone in zones.values()]
+        calls = zones_project.connector.api_calls
+        zones_project.update_drawing(ids[0], z=5)
+        updated = zones_project.update_drawings({ids[1]: dict(x=0), ids[2]: dict(y=0)})
+        # One request per drawing, without retrieving the drawings again
+        assert zones_project.connector.api_calls == calls + 3
+        assert zones_project.get_drawing(ids[0])["z"] == 5
+        assert [(d["x"], d["y"]) for d in updated] == [(0, -34), (-60, 0)]
+        assert zones_project.get_drawing(ids[2]) is updated[1]
+
+    def test_delete_drawings(self, zones_project):
+        zones = zones_project.draw_zones({"a": ["IOU1"], "b": ["IOU2"], "c": ["vEOS"]})
+        ids = [zone["drawing_id"] for zone in zones.values()]
+        calls = zones_project.connector.api_calls
+        zones_project.delete_drawings(ids[:2])
+        assert zones_project.connector.api_calls == calls + 2
+        assert [d["drawing_id"] for d in zones_project.drawings] == [
+            CDRAWING["id"],
+            "622224a0-1ed4-4d7b-a263-89cebe511432",
+            ids[2],
+        ]
+        assert zones_project.get_drawing(ids[0]) is None
+
+    def test_create_drawings(self, zones_project):
+        builder = DrawingBuilder(z=2).grid(0, 0, 2, 1).labels([0, 100], -20, ["A", "B"])
+        calls = zones_project.connector.api_calls
+        created = zones_project.create_drawings(builder.drawings)
+        # One request for the current drawings, then one per drawing
+        assert zones_project.connector.api_calls == calls + 8
+        assert [d["svg"] for d in created] == [d["svg"] for d in builder.drawings]
+        assert len({d["drawing_id"] for d in created}) == 7
+        assert created[-1]["x"] == 100 and created[-1]["z"] == 2
+        assert not created[-1]["locked"]
+        assert all(d in zones_project.drawings for d in created)
+
+    def test_drawing_shapes(self, api_test_project):
+        shapes = api_test_project.drawing_shapes()
+        assert shapes[CDRAWING["id"]] == drawing_utils.Svg(
+            200,
+            100,
+            (drawing_utils.Rect(200, 100, 0, 0, "#ffffff", 1.0, "#000000", 2),),
+        )
+        ellipses = api_test_project.drawing_shapes(kind=drawing_utils.Ellipse)
+        assert list(ellipses) == ["622224a0-1ed4-4d7b-a263-89cebe511432"]
+        assert ellipses["622224a0-1ed4-4d7b-a263-89cebe511432"].shapes[0].rx == 100
+
+    def test_drawing_shapes_invalid_svg(self, capsys, fresh_project):
+        fresh_project.get()
+        fresh_project.drawings.append(
+            dict(fresh_project.drawings[0], drawing_id="BROKEN", svg="<svg><rect>")
+        )
+        shapes = fresh_project.drawing_shapes()
+        assert "BROKEN" not in shapes and CDRAWING["id"] in shapes
+        assert capsys.readouterr().out.startswith(
+            "Skipped drawing: BROKEN -- Not a valid SVG"
+        )
+
+    def test_error_update_drawings_not_found(self, api_test_project):
+        with pytest.raises(ValueError, match="Drawings not found: dummy"):
+            api_test_project.update_drawings({"dummy": dict(x=0)})
+
+    def test_draw_zones_drawings_not_retrieved(self, zones_project):
+        project = Project(project_id=CPROJECT["id"], connector=zones_project.connector)
+        project.get_nodes()
+        assert project.drawings is None
+        zones = project.draw_zones({"core": ["vEOS"]})
+        assert [d["drawing_id"] for d in project.drawings][-1] == (
+            zones["core"]["drawing_id"]
+        )
+        assert len(project.drawings) == 3
+
+    def test_error_draw_zones_empty_group(self, zones_project):
+        with pytest.raises(ValueError, match="Zones without nodes: z"):
+            zones_project.draw_zones({"a": ["vEOS"], "z": []})
+
+    def test_draw_zones_ellipse(self, zones_project):
+        zone = zones_project.draw_zones({"core": ["vEOS"]}, shape="ellipse")["core"]
+        # vEOS is 60x60 at (-20, -6), so the padded box is 140x140 centred on (10, 24)
+        assert zone["svg"].startswith(
+            '<svg data-zone="core" height="198" width="198"><ellipse cx="99"'
+        )
+        assert (zone["x"], zone["y"]) == (10 - 99, 24 - 99)
+
+    @pytest.mark.parametrize(
+        "kwargs,expected",
+        [
+            (dict(groups={"a": ["IOU1", "dummy"]}), "Nodes not found: dummy"),
+            (dict(groups={"a": ["IOU1"]}, shape="hull"), "Not a valid shape - hull"),
+        ],
+    )
+    def test_error_draw_zones(self, api_test_project, kwargs, expected):
+        with pytest.raises(ValueError, match=expected):
+            api_test_project.draw_zones(**kwargs)
+
     def test_delete_drawing(self, api_test_project):
         response = api_test_project.delete_drawing(drawing_id=CDRAWING["id"])
         assert response is None
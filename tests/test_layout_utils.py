@@ -0,0 +1,113 @@
+from gns3fy.layout_utils import (
+    NODE_TYPE_TIERS,
+    SpatialIndex,
+    circular_layout,
+    force_layout,
+    grid_layout,
+    tiered_layout,
+)
+
+
+def distance(a, b):
+    return ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+
+
+def test_circular_layout():
+    positions = circular_layout(["a", "b", "c", "d"], radius=100)
+    assert positions == {"a": (0, -100), "b": (100, 0), "c": (0, 100), "d": (-100, 0)}
+
+
+def test_grid_layout():
+    positions = grid_layout(["a", "b", "c", "d", "e"], spacing=100)
+    assert positions == {
+        "a": (-100, -50),
+        "b": (0, -50),
+        "c": (100, -50),
+        "d": (-100, 50),
+        "e": (0, 50),
+    }
+    assert grid_layout(["a", "b", "c"], spacing=100, columns=1)["c"] == (0, 100)
+
+
+def test_tiered_layout():
+    tiers = {
+        "h1": NODE_TYPE_TIERS["docker"],
+        "h2": NODE_TYPE_TIERS["vpcs"],
+        "sw": NODE_TYPE_TIERS["ethernet_switch"],
+        "r1": NODE_TYPE_TIERS["iou"],
+        "r2": NODE_TYPE_TIERS["qemu"],
+        "cloud": NODE_TYPE_TIERS["cloud"],
+    }
+    edges = [("cloud", "r2"), ("r2", "sw"), ("sw", "h2"), ("r1", "r2")]
+    positions = tiered_layout(tiers, edges, spacing_x=100, spacing_y=100)
+    assert positions == {
+        "cloud": (0, -150),
+        "r1": (-50, -50),
+        "r2": (50, -50),
+        "sw": (0, 50),
+        "h1": (-50, 150),
+        "h2": (50, 150),
+    }
+    # Rows are sorted by the position of the neighbours above, to avoid crossings
+    tiers = {"a": 0, "b": 0, "x": 1, "y": 1}
+    positions = tiered_layout(tiers, [("b", "x"), ("a", "y")])
+    assert positions["y"][0] < positions["x"][0]
+
+
+def test_force_layout():
+    ids = [f"n{i}" for i in range(12)]
+    # Two rings of nodes joined by a single link
+    edges = [(ids[i], ids[(i + 1) % 6]) for i in range(6)]
+    edges += [(ids[6 + i], ids[6 + (i + 1) % 6]) for i in range(6)]
+    edges += [("n0", "n6")]
+    positions = force_layout(ids, edges, spacing=100)
+    assert positions == force_layout(ids, edges, spacing=100)
+    for a in ids:
+        for b in ids:
+            if a != b:
+                assert distance(positions[a], positions[b]) > 40
+    # Linked nodes are closer than the average pair of nodes
+    linked = sum(distance(positions[a], positions[b]) for a, b in edges) / len(edges)
+    average = sum(
+        distance(positions[a], positions[b]) for a in ids for b in ids if a < b
+    ) / (len(ids) * (len(ids) - 1) / 2)
+    assert linked < average
+
+
+def test_force_layout_start_positions():
+    positions = force_layout(["a"], positions={"a": (500, 500)})
+    assert positions == {"a": (0, 0)}
+    assert force_layout([]) == {}
+
+
+def test_spatial_index():
+    index = SpatialIndex(cell_size=50)
+    index.insert("a", 0, 0, 60, 60)
+    index.insert("b", 50, 50, 60, 60)
+    index.insert("c", 60, 0, 40, 60)
+    index.insert("d", 1000, 1000, 500, 20)
+    assert len(index) == 4 and "d" in index
+    assert index.overlaps() == [("a", "b"), ("b", "c")]
+    assert index.query(-10, -10, 20, 20) == {"a"}
+    assert index.query(0, 0, 2000, 2000) == {"a", "b", "c", "d"}
+    assert index.query(1400, 990, 5, 5) == set()
+    assert index.query(1400, 1010, 5, 5) == {"d"}
+    index.insert("b", 500, 500, 60, 60)
+    assert index.overlaps() == []
+    assert index.box("b") == (500, 500, 60, 60)
+    index.remove("d")
+    assert index.query(1400, 1010, 5, 5) == set()
+    assert index.box("d") is None
+
+
+def test_spatial_index_nearest_free():
+    index = SpatialIndex()
+    assert index.nearest_free(0, 0, 60, 60) == (0, 0)
+    index.insert("a", 0, 0, 60, 60)
+    assert index.nearest_free(0, 0, 60, 60) in [(-80, 0), (80, 0), (0, -80), (0, 80)]
+    for x in range(-100, 101, 10):
+        for y in range(-100, 101, 10):
+            index.insert((x, y), x, y, 10, 10)
+    x, y = index.nearest_free(0, 0, 60, 60, margin=0)
+    assert not index.query(x, y, 60, 60)
+    assert max(abs(x), abs(y)) <= 120
@@ -0,0 +1,68 @@
+import struct
+import pytest
+from pathlib import Path
+from gns3fy.pcap_utils import Packet, iter_pcap_packets
+
+
+DATA_FILES = Path(__file__).resolve().parent / "data"
+
+
+def pcap_data():
+    with open(DATA_FILES / "capture.pcap", "rb") as fdata:
+        data = fdata.read()
+    return data
+
+
+def test_iter_pcap_packets():
+    packets = list(iter_pcap_packets([pcap_data()]))
+    assert [p.timestamp for p in packets] == [
+        1600000000.001,
+        1600000000.5,
+        1600000001.0,
+        1600000002.00025,
+    ]
+    assert packets[0] == Packet(
+        timestamp=1600000000.001,
+        length=54,
+        captured=54,
+        src_mac="0c:4e:2f:8b:00:01",
+        dst_mac="0c:4e:2f:8b:00:02",
+        ethertype=0x0800,
+        src_ip="10.0.0.1",
+        dst_ip="10.0.0.2",
+        protocol=6,
+    )
+    assert (packets[1].vlan, packets[1].src_ip, packets[1].protocol) == (
+        10,
+        "192.168.10.1",
+        17,
+    )
+    assert (packets[2].src_ip, packets[2].dst_ip) == ("2001:db8::1", "2001:db8::2")
+    assert (packets[3].ethertype, packets[3].src_ip) == (0x0806, None)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 16, 24, 53, 299])
+def test_iter_pcap_packets_chunked(chunk_size):
+    data = pcap_data()
+    chunks = (data[i:][:chunk_size] for i in range(0, len(data), chunk_size))
+    assert list(iter_pcap_packets(chunks)) == list(iter_pcap_packets([data]))
+
+
+def test_iter_pcap_packets_incomplete():
+    # A packet still being captured is only yielded once it is complete
+    assert len(list(iter_pcap_packets([pcap_data()[:-10]]))) == 3
+
+
+def test_iter_pcap_packets_big_endian_nanoseconds():
+    frame = bytes(12) + b"\x08\x00" + b"\x45" + bytes(5)
+    data = struct.pack(">IHHiIII", 0xA1B23C4D, 2, 4, 0, 0, 65535, 1)
+    data += struct.pack(">IIII", 10, 500_000_000, len(frame), 1500) + frame
+    (packet,) = iter_pcap_packets([data])
+    assert packet.timestamp == 10.5
+    assert (packet.captured, packet.length) == (20, 1500)
+    assert packet.malformed is True
+
+
+def test_error_iter_pcap_packets_not_pcap():
+    with pytest.raises(ValueError, match="Not a valid pcap stream"):
+        list(iter_pcap_packets([bytes(100)]))